@@ -0,0 +1,118 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("DEFAULT_USER_ROLE", "consumer")
+
+from redis.asyncio import Redis  # noqa: E402
+
+from src.auth.blacklist import TokensRedisBlacklist  # noqa: E402
+
+PREFIX = "benchmark:blacklist:"
+BATCH_SIZE = 10_000
+
+
+async def _used_memory(client: Redis) -> int:
+    return int((await client.info("memory"))["used_memory"])
+
+
+async def _cleanup(client: Redis, pattern: str) -> None:
+    batch = []
+    async for key in client.scan_iter(match=pattern, count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            await client.unlink(*batch)
+            batch.clear()
+    if batch:
+        await client.unlink(*batch)
+
+
+async def measure(
+    client: Redis, layout: str, count: int, window_days: int, bucket_seconds: int
+) -> dict:
+    # Mirrors TokensRedisBlacklist's two layouts under a scratch prefix, with expiries
+    # spread over the refresh window the way organic logouts would be.
+    pattern = f"{PREFIX}{layout}:*"
+    await _cleanup(client, pattern)
+    rng = random.Random(count)
+    now = int(time.time())
+    before = await _used_memory(client)
+
+    started_at = time.perf_counter()
+    for start in range(0, count, BATCH_SIZE):
+        async with client.pipeline(transaction=False) as pipe:
+            for _ in range(min(BATCH_SIZE, count - start)):
+                jti = str(uuid.UUID(int=rng.getrandbits(128), version=4))
+                expire_at = now + rng.randint(60, window_days * 86400)
+                if layout == "keys":
+                    pipe.set(f"{pattern[:-1]}{jti}", "1", exat=expire_at)
+                else:
+                    bucket = expire_at // bucket_seconds
+                    key = f"{pattern[:-1]}{bucket}"
+                    pipe.sadd(key, TokensRedisBlacklist._member(jti))
+                    pipe.expireat(key, (bucket + 1) * bucket_seconds)
+            await pipe.execute()
+    elapsed = time.perf_counter() - started_at
+
+    used = await _used_memory(client) - before
+    keys = 0
+    async for _ in client.scan_iter(match=pattern, count=1000):
+        keys += 1
+    await _cleanup(client, pattern)
+    return {
+        "layout": layout,
+        "tokens": count,
+        "keys": keys,
+        "used_memory_bytes": used,
+        "bytes_per_token": used / count if count else 0.0,
+        "write_seconds": elapsed,
+    }
+
+
+async def main_async(args) -> list[dict]:
+    client = Redis.from_url(args.redis_url, decode_responses=False)
+    try:
+        return [
+            await measure(
+                client=client,
+                layout=layout,
+                count=count,
+                window_days=args.window_days,
+                bucket_seconds=args.bucket_seconds,
+            )
+            for count in args.counts
+            for layout in ("keys", "buckets")
+        ]
+    finally:
+        await client.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare Redis memory of the per-key and bucketed blacklist layouts"
+    )
+    parser.add_argument("--redis-url", required=True)
+    parser.add_argument("--counts", default="100000,1000000")
+    parser.add_argument("--window-days", type=int, default=14)
+    parser.add_argument("--bucket-seconds", type=int, default=3600)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    args.counts = [int(count) for count in args.counts.split(",") if count]
+
+    output = json.dumps({"results": asyncio.run(main_async(args))}, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable
+
+
+def _summarize(name: str, samples: list[float], inner: int, params: dict) -> dict:
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "name": name,
+        "params": params,
+        "rounds": len(samples),
+        "inner": inner,
+        "median_us": median * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+        "min_us": samples[0] * 1e6,
+        "stdev_us": statistics.pstdev(samples) * 1e6,
+        "ops_per_sec": 1 / median if median else 0.0,
+    }
+
+
+def bench(
+    name: str,
+    func: Callable[[], object],
+    rounds: int = 30,
+    inner: int = 100,
+    warmup: int = 3,
+    **params,
+) -> dict:
+    for _ in range(warmup):
+        for _ in range(inner):
+            func()
+
+    samples = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for _ in range(inner):
+            func()
+        samples.append((time.perf_counter() - started_at) / inner)
+    return _summarize(name=name, samples=samples, inner=inner, params=params)
+
+
+async def bench_async(
+    name: str,
+    func: Callable[[], Awaitable[object]],
+    rounds: int = 30,
+    inner: int = 100,
+    warmup: int = 3,
+    **params,
+) -> dict:
+    for _ in range(warmup):
+        for _ in range(inner):
+            await func()
+
+    samples = []
+    for _ in range(rounds):
+        started_at = time.perf_counter()
+        for _ in range(inner):
+            await func()
+        samples.append((time.perf_counter() - started_at) / inner)
+    return _summarize(name=name, samples=samples, inner=inner, params=params)
+
+
+def compare(results: list[dict], baseline: list[dict], tolerance: float) -> list[dict]:
+    def key(result: dict) -> tuple:
+        return result["name"], tuple(sorted(result["params"].items()))
+
+    previous = {key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        if (before := previous.get(key(result))) is None:
+            continue
+        ratio = result["median_us"] / before["median_us"] if before["median_us"] else 1.0
+        result["baseline_ratio"] = ratio
+        if ratio > 1 + tolerance:
+            regressions.append(result)
+    return regressions
+
+
+def run(coroutine: Awaitable) -> object:
+    return asyncio.run(coroutine)
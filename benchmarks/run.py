@@ -0,0 +1,455 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("JWT_SECRET", "benchmark-secret")
+os.environ.setdefault("DEFAULT_USER_ROLE", "consumer")
+os.environ.setdefault(
+    "SQLITE_DSN", f"sqlite+aiosqlite:///{tempfile.gettempdir()}/benchmark-app.db"
+)
+
+from benchmarks.harness import bench, bench_async, compare, run  # noqa: E402
+
+# Refresh it with `python -m benchmarks.run --save-baseline` on the reference host,
+# compare later runs with `python -m benchmarks.run --baseline benchmarks/baseline.json`.
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SUITES = ("jwt", "password", "permissions", "users", "blacklist", "serialization")
+
+
+def jwt_suite(args) -> list[dict]:
+    from src.core.jwt import decode_token, generate_access_token, generate_refresh_token
+
+    payload = {"sub": "42"}
+    access_token = generate_access_token(payload=payload)
+    return [
+        bench("generate_access_token", lambda: generate_access_token(payload=payload)),
+        bench("generate_refresh_token", lambda: generate_refresh_token(payload=payload)),
+        bench("decode_token", lambda: decode_token(access_token)),
+    ]
+
+
+def password_suite(args) -> list[dict]:
+    from src.core.security import hash_password, verify_password
+
+    hashed_password = hash_password("benchmark-password")
+    return [
+        bench(
+            "hash_password",
+            lambda: hash_password("benchmark-password"),
+            rounds=5,
+            inner=2,
+        ),
+        bench(
+            "verify_password",
+            lambda: verify_password("benchmark-password", hashed_password),
+            rounds=5,
+            inner=2,
+        ),
+    ]
+
+
+def permissions_suite(args) -> list[dict]:
+    from src.permissions.registry import PermissionRegistry
+    from src.permissions.service import PermissionService
+
+    results = []
+    for size, granted, required in (("small", 8, 2), ("large", 2000, 50)):
+        registry = PermissionRegistry()
+        names = [f"resource{i}:action" for i in range(size == "small" and 16 or 4000)]
+        role_mask = registry.set_role(role_id=1, names=names[:granted])
+        # Straddles the granted range: "any" passes, "all" is denied.
+        required_names = names[granted - required // 2 : granted + required // 2]
+        required_mask = registry.mask(required_names)
+        granted_mask = registry.mask(names[:required])
+        results += [
+            bench(
+                "PermissionService.check_permissions",
+                lambda: PermissionService.check_permissions(
+                    role_mask=role_mask, required_mask=required_mask, required_all=False
+                ),
+                inner=1000,
+                size=size,
+                mode="any",
+            ),
+            bench(
+                "PermissionService.check_permissions",
+                lambda: _forbidden_ok(
+                    PermissionService.check_permissions,
+                    role_mask=role_mask,
+                    required_mask=required_mask,
+                    required_all=True,
+                ),
+                inner=1000,
+                size=size,
+                mode="all",
+                outcome="denied",
+            ),
+            bench(
+                "PermissionService.check_permissions",
+                lambda: PermissionService.check_permissions(
+                    role_mask=role_mask, required_mask=granted_mask, required_all=True
+                ),
+                inner=1000,
+                size=size,
+                mode="all",
+                outcome="granted",
+            ),
+            bench(
+                "PermissionRegistry.mask",
+                lambda: registry.mask(required_names),
+                size=size,
+            ),
+        ]
+    return results
+
+
+def _forbidden_ok(func, **kwargs) -> None:
+    from fastapi import HTTPException
+
+    try:
+        func(**kwargs)
+    except HTTPException:
+        pass
+
+
+def _users_database(db_dir: Path, count: int) -> Path:
+    from sqlalchemy import create_engine
+
+    from src.core.database import Base
+    import src.permissions.models  # noqa: F401
+    import src.users.models  # noqa: F401
+
+    path = db_dir / f"users_{count}.db"
+    if path.exists():
+        return path
+
+    db_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+    engine = create_engine(f"sqlite:///{tmp_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    connection = sqlite3.connect(tmp_path)
+    connection.execute("INSERT INTO roles (id, name) VALUES (1, 'consumer')")
+    batch = 50_000
+    for start in range(1, count + 1, batch):
+        connection.executemany(
+            "INSERT INTO users"
+            " (id, email, full_name, hashed_password, is_active, role_id)"
+            " VALUES (?, ?, ?, 'x', 1, 1)",
+            (
+                (i, f"user{i}@example.com", f"User {i}")
+                for i in range(start, min(start + batch, count + 1))
+            ),
+        )
+        connection.commit()
+    connection.close()
+    tmp_path.rename(path)
+    return path
+
+
+def users_suite(args) -> list[dict]:
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    from src.users.repositories import UserRepository
+
+    async def measure(count: int) -> list[dict]:
+        path = _users_database(db_dir=Path(args.db_dir), count=count)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=1)
+        session_factory = async_sessionmaker(
+            bind=engine, expire_on_commit=False, class_=AsyncSession
+        )
+        rng = random.Random(count)
+        ids = [rng.randint(1, count) for _ in range(4096)]
+        position = {"get": 0, "get_by_email": 0}
+
+        async def get():
+            position["get"] += 1
+            async with session_factory() as session:
+                await UserRepository(session).get(id=ids[position["get"] % len(ids)])
+
+        async def get_by_email():
+            position["get_by_email"] += 1
+            email = f"user{ids[position['get_by_email'] % len(ids)]}@example.com"
+            async with session_factory() as session:
+                await UserRepository(session).get_by_email(email=email)
+
+        try:
+            return [
+                await bench_async("UserRepository.get", get, rounds=20, users=count),
+                await bench_async(
+                    "UserRepository.get_by_email", get_by_email, rounds=20, users=count
+                ),
+            ]
+        finally:
+            await engine.dispose()
+
+    results = []
+    for count in args.user_counts:
+        results += run(measure(count))
+    return results
+
+
+def blacklist_suite(args) -> list[dict]:
+    import src.auth.blacklist as blacklist_module
+    from fakeredis import FakeAsyncRedis
+    from redis.asyncio import Redis
+    from src.core.config import settings
+
+    far_future = int(datetime.now(timezone.utc).timestamp()) + 3600
+
+    async def measure(backend: str) -> list[dict]:
+        if args.redis_url:
+            client = Redis.from_url(args.redis_url, decode_responses=backend == "keys")
+        else:
+            # In-process Redis that runs the Lua scripts through lupa, so offline runs
+            # cover every operation, rotation included, minus the network round trip.
+            client = FakeAsyncRedis(decode_responses=backend == "keys")
+        # The hot path uses the breaker-guarded client, the filter rebuild the main one.
+        blacklist_module.redis_client = client
+        blacklist_module.blacklist_redis_client = client
+        blacklist_module.blacklist_binary_redis_client = client
+        settings.BLACKLIST_BACKEND = backend
+        labels = {"backend": backend, "redis": "server" if args.redis_url else "fake"}
+        blacklist = blacklist_module.TokensRedisBlacklist()
+
+        revoked = [str(uuid.UUID(int=i)) for i in range(10_000)]
+        for jti in revoked:
+            await blacklist.revoke_token(jti=jti, expire_at=far_future)
+
+        async def revoke():
+            await blacklist.revoke_token(jti=str(uuid.uuid4()), expire_at=far_future)
+
+        tokens = [
+            (revoked[i] if i % 10 == 0 else str(uuid.uuid4()), far_future)
+            for i in range(100)
+        ]
+        active = str(uuid.uuid4())
+        results = [
+            await bench_async("TokensRedisBlacklist.revoke_token", revoke, **labels),
+            await bench_async(
+                "TokensRedisBlacklist.is_revoked",
+                lambda: blacklist.is_revoked(jti=active, expire_at=far_future),
+                **labels,
+                filter="off",
+            ),
+            await bench_async(
+                "TokensRedisBlacklist.are_revoked",
+                lambda: blacklist.are_revoked(tokens=tokens),
+                **labels,
+                filter="off",
+                batch=len(tokens),
+            ),
+        ]
+        family = {"jti": str(uuid.uuid4())}
+
+        async def rotate():
+            new_jti = str(uuid.uuid4())
+            await blacklist.rotate(
+                jti=family["jti"],
+                expire_at=far_future,
+                new_jti=new_jti,
+                family=f"bench-family-{backend}",
+                family_expire_at=far_future,
+            )
+            family["jti"] = new_jti
+
+        results.append(await bench_async("TokensRedisBlacklist.rotate", rotate, **labels))
+        await blacklist._rebuild()
+        results += [
+            await bench_async(
+                "TokensRedisBlacklist.is_revoked",
+                lambda: blacklist.is_revoked(jti=active, expire_at=far_future),
+                **labels,
+                filter="on",
+            ),
+            await bench_async(
+                "TokensRedisBlacklist.are_revoked",
+                lambda: blacklist.are_revoked(tokens=tokens),
+                **labels,
+                filter="on",
+                batch=len(tokens),
+            ),
+        ]
+        await blacklist.stop()
+        return results
+
+    results = []
+    for backend in ("keys", "buckets"):
+        results += run(measure(backend))
+    return results
+
+
+def serialization_suite(args) -> list[dict]:
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from sqlalchemy.ext.asyncio import (
+        AsyncSession,
+        async_sessionmaker,
+        create_async_engine,
+    )
+
+    from src.users.repositories import UserRepository
+    from src.users.router import router
+    from src.users.schemas import user_rows
+
+    # FastAPI's own response field for GET /users, so the baseline is exactly the
+    # validate-then-serialize path a response_model route takes for ORM objects.
+    field = next(
+        route.response_field
+        for route in router.routes
+        if route.path == "/users" and "GET" in route.methods
+    )
+
+    async def response_model(page) -> bytes:
+        content = await serialize_response(field=field, response_content=page)
+        return JSONResponse(content=content).body
+
+    async def measure(count: int) -> list[dict]:
+        path = _users_database(db_dir=Path(args.db_dir), count=count)
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=1)
+        session_factory = async_sessionmaker(
+            bind=engine, expire_on_commit=False, class_=AsyncSession
+        )
+
+        async def fetch_orm():
+            async with session_factory() as session:
+                return await UserRepository(session).get_page(limit=count)
+
+        async def fetch_rows():
+            async with session_factory() as session:
+                return await UserRepository(session).get_rows_page(limit=count)
+
+        async def orm_end_to_end():
+            await response_model(await fetch_orm())
+
+        async def rows_end_to_end():
+            user_rows.page_response(await fetch_rows())
+
+        try:
+            orm_page = await fetch_orm()
+            rows_page = await fetch_rows()
+            assert (
+                await response_model(orm_page) == user_rows.page_response(rows_page).body
+            )
+            options = {"rounds": 10, "inner": 1, "warmup": 1, "rows": count}
+            return [
+                await bench_async(
+                    "users_page_response",
+                    lambda: response_model(orm_page),
+                    path="response_model",
+                    stage="serialize",
+                    **options,
+                ),
+                bench(
+                    "users_page_response",
+                    lambda: user_rows.page_response(rows_page),
+                    path="pre_encoded",
+                    stage="serialize",
+                    **options,
+                ),
+                await bench_async(
+                    "users_page_response",
+                    orm_end_to_end,
+                    path="response_model",
+                    stage="fetch_and_serialize",
+                    **options,
+                ),
+                await bench_async(
+                    "users_page_response",
+                    rows_end_to_end,
+                    path="pre_encoded",
+                    stage="fetch_and_serialize",
+                    **options,
+                ),
+            ]
+        finally:
+            await engine.dispose()
+
+    results = []
+    for count in args.response_rows:
+        results += run(measure(count))
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth hot path micro-benchmarks")
+    parser.add_argument("--suite", default=",".join(SUITES))
+    parser.add_argument("--user-counts", default="1000,100000,1000000")
+    parser.add_argument("--response-rows", default="10000")
+    parser.add_argument("--db-dir", default=".benchmarks")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+    args.user_counts = [int(count) for count in args.user_counts.split(",") if count]
+    args.response_rows = [int(count) for count in args.response_rows.split(",") if count]
+
+    suites = {
+        "jwt": jwt_suite,
+        "password": password_suite,
+        "permissions": permissions_suite,
+        "users": users_suite,
+        "blacklist": blacklist_suite,
+        "serialization": serialization_suite,
+    }
+    results = []
+    for name in args.suite.split(","):
+        print(f"Running {name} benchmarks...", file=sys.stderr)
+        results += suites[name](args)
+
+    regressions = []
+    if args.baseline and not args.save_baseline:
+        baseline = json.loads(Path(args.baseline).read_text())["results"]
+        regressions = compare(
+            results=results, baseline=baseline, tolerance=args.tolerance
+        )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": results,
+        "regressions": [result["name"] for result in regressions],
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        Path(args.baseline or BASELINE_PATH).write_text(output)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
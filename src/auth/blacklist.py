@@ -1,22 +1,593 @@
+import asyncio
+import logging
+import time
+import uuid
+from collections import deque
 from datetime import datetime, timezone
 
-from src.core.redis import redis_client
+from redis.exceptions import RedisError
+
+from src.auth.bloom import BloomFilter
+from src.core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from src.core.config import settings
+from src.core.redis import (
+    blacklist_binary_redis_client,
+    blacklist_redis_client,
+    redis_client,
+)
+from src.exceptions.exceptions import ServiceUnavailableException
+from src.metrics.collectors import BLACKLIST_REPLAY_QUEUE, REDIS_COMMAND_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Rotates a refresh token within its family in one round trip. The family key holds
+# "<jti>|<exp>" of the only token that may still be exchanged. Presenting any other
+# jti of the family, or one already blacklisted, is reuse of a rotated token: the
+# family is marked revoked and its live jti blacklisted, so neither the thief nor
+# the victim can refresh again. Storage follows the blacklist backend: one key per
+# jti ("keys") or binary members of hourly expiry sets ("buckets"), encoded like
+# TokensRedisBlacklist._member. Returns {status, jti blacklisted by this call}.
+#
+# Tokens rotated while Redis was down carry the (jti, exp) chain of rotations Redis
+# has not seen yet (ARGV[10..]). A family still pointing into that chain is caught
+# up here, on whichever worker the token lands. Replay mode (ARGV[9]) re-applies a
+# queued local rotation: it blacklists the old jti and advances the family only if
+# nothing else has moved it since, and never reports reuse itself.
+ROTATE_SCRIPT = """
+local family_key, feed_key = KEYS[1], KEYS[2]
+local jti, expire_at, new_jti, new_expire_at, mode, prefix, maxlen, bucket_seconds,
+    replay = unpack(ARGV, 1, 9)
+local uuid_pattern = '^' .. string.rep('[0-9a-f]', 8) .. '%-'
+    .. string.rep('[0-9a-f]', 4) .. '%-' .. string.rep('[0-9a-f]', 4) .. '%-'
+    .. string.rep('[0-9a-f]', 4) .. '%-' .. string.rep('[0-9a-f]', 12) .. '$'
+
+local function member(id)
+    if not string.match(id, uuid_pattern) then
+        return '\\0' .. id
+    end
+    return '\\1' .. (string.gsub(string.gsub(id, '-', ''), '%x%x', function(hex)
+        return string.char(tonumber(hex, 16))
+    end))
+end
+
+local function bucket(exp)
+    return math.floor(tonumber(exp) / tonumber(bucket_seconds))
+end
+
+local function is_revoked(id, exp)
+    if mode == 'keys' then
+        return redis.call('EXISTS', prefix .. id) == 1
+    end
+    return redis.call('SISMEMBER', prefix .. bucket(exp), member(id)) == 1
+end
+
+local function revoke(id, exp)
+    if mode == 'keys' then
+        redis.call('SET', prefix .. id, '1', 'EXAT', exp)
+    else
+        local key = prefix .. bucket(exp)
+        redis.call('SADD', key, member(id))
+        redis.call('EXPIREAT', key, (bucket(exp) + 1) * tonumber(bucket_seconds))
+    end
+    redis.call('XADD', feed_key, 'MAXLEN', '~', maxlen, '*', 'jti', id)
+end
+
+local current = redis.call('GET', family_key)
+if current == 'revoked' then
+    return {'revoked', false}
+end
+-- Families rotated before the expiry was stored fall back to the newest expiry.
+local current_jti, current_expire_at = current, new_expire_at
+if current and string.find(current, '|', 1, true) then
+    local separator = string.find(current, '|', 1, true)
+    current_jti = string.sub(current, 1, separator - 1)
+    current_expire_at = string.sub(current, separator + 1)
+end
+
+if replay == '1' then
+    revoke(jti, expire_at)
+    if not current or current_jti == jti then
+        redis.call(
+            'SET', family_key, new_jti .. '|' .. new_expire_at, 'EXAT', new_expire_at
+        )
+    end
+    return {'rotated', jti}
+end
+
+local caught_up = nil
+if current and current_jti ~= jti then
+    for i = 10, #ARGV - 1, 2 do
+        if ARGV[i] == current_jti then
+            caught_up = i
+            break
+        end
+    end
+end
+if is_revoked(jti, expire_at) or (current and current_jti ~= jti and not caught_up) then
+    redis.call('SET', family_key, 'revoked', 'EXAT', new_expire_at)
+    if current then
+        revoke(current_jti, current_expire_at)
+    end
+    return {'reused', current_jti}
+end
+if caught_up then
+    for i = caught_up, #ARGV - 1, 2 do
+        revoke(ARGV[i], ARGV[i + 1])
+    end
+end
+revoke(jti, expire_at)
+redis.call('SET', family_key, new_jti .. '|' .. new_expire_at, 'EXAT', new_expire_at)
+return {'rotated', jti}
+"""
+
+revoke_seconds = REDIS_COMMAND_SECONDS.labels(component="blacklist", command="revoke")
+rotate_seconds = REDIS_COMMAND_SECONDS.labels(component="blacklist", command="rotate")
+get_seconds = REDIS_COMMAND_SECONDS.labels(component="blacklist", command="get")
+mget_seconds = REDIS_COMMAND_SECONDS.labels(component="blacklist", command="mget")
+
+UNAVAILABLE = (CircuitOpenError, RedisError, OSError)
 
 
 class TokensRedisBlacklist:
     PREFIX = "auth:blacklist:"
+    BUCKET_PREFIX = "auth:blacklist-bucket:"
+    FAMILY_PREFIX = "auth:refresh_family:"
+    FEED_KEY = "auth:blacklist-feed"
+
+    ROTATED = "rotated"
+    ROTATED_LOCALLY = "rotated_locally"
+    REUSED = "reused"
+    REVOKED = "revoked"
+
+    LOCAL_MAX_ENTRIES = 100_000
+    # Longest chain of unconfirmed rotations a refresh token carries.
+    MAX_ANCESTORS = 16
+
+    def __init__(self) -> None:
+        if settings.BLACKLIST_FAIL_MODE not in ("open", "closed"):
+            raise ValueError(
+                f"Unknown blacklist fail mode '{settings.BLACKLIST_FAIL_MODE}'"
+            )
+        if settings.BLACKLIST_BACKEND not in ("keys", "buckets"):
+            raise ValueError(f"Unknown blacklist backend '{settings.BLACKLIST_BACKEND}'")
+        self.fail_open = settings.BLACKLIST_FAIL_MODE == "open"
+        # Each backend only reads its own layout: switching BLACKLIST_BACKEND while
+        # revoked tokens are still unexpired would let them through, so change
+        # it only once JWT_REFRESH_TOKEN_EXP_DAYS have passed since the last revocation.
+        self.backend = settings.BLACKLIST_BACKEND
+        self.bucket_seconds = settings.BLACKLIST_BUCKET_SEC
+        # Bucket members are raw 16-byte jtis, which the text client cannot decode.
+        self._client = (
+            blacklist_binary_redis_client
+            if self.backend == "buckets"
+            else blacklist_redis_client
+        )
+        self.breaker = CircuitBreaker(
+            name="blacklist",
+            failure_threshold=settings.BLACKLIST_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout_seconds=settings.BLACKLIST_BREAKER_RESET_SEC,
+            errors=(RedisError, OSError),
+        )
+        self._rotate_script = self._client.register_script(ROTATE_SCRIPT)
+        # Degraded mode: revocations made while Redis is unreachable, keyed by jti
+        # or family, with their expiry. The queue replays them once Redis is back as
+        # (jti, expire_at, family, new_jti, family_expire_at); entries with a new_jti
+        # are rotations and go through the rotate script so the family moves on too.
+        self._local: dict[str, int] = {}
+        self._replay_queue: deque[tuple] = deque()
+        self._replay_task: asyncio.Task | None = None
+        self._filter: BloomFilter | None = None
+        self._feed_id = "0-0"
+        self._task: asyncio.Task | None = None
+        self.filter_negatives = 0
+        self.filter_hits = 0
+        self.false_positives = 0
 
     def __get_key(self, jti: str) -> str:
         return f"{self.PREFIX}{jti}"
 
-    async def revoke_token(self, jti: str, expire_at: int) -> None:
-        ttl = expire_at - int(datetime.now(timezone.utc).timestamp())
-        if ttl <= 0:
+    def __get_family_key(self, family: str) -> str:
+        return f"{self.FAMILY_PREFIX}{family}"
+
+    def __get_bucket(self, expire_at: int) -> int:
+        return expire_at // self.bucket_seconds
+
+    def __get_storage_key(self, jti: str, expire_at: int) -> str:
+        if self.backend == "keys":
+            return self.__get_key(jti=jti)
+        return f"{self.BUCKET_PREFIX}{self.__get_bucket(expire_at=expire_at)}"
+
+    @staticmethod
+    def _member(jti: str) -> bytes:
+        # Canonical UUIDs (every jti we issue) pack into 16 bytes; anything else is
+        # stored verbatim. The tag byte keeps the two encodings apart and, at 17
+        # bytes, still lands in the same allocation class as the raw UUID.
+        try:
+            value = uuid.UUID(jti)
+        except ValueError:
+            value = None
+        if value is not None and str(value) == jti:
+            return b"\x01" + value.bytes
+        return b"\x00" + jti.encode()
+
+    @staticmethod
+    def _decode_member(member: bytes) -> str:
+        if member.startswith(b"\x01"):
+            return str(uuid.UUID(bytes=member[1:]))
+        return member[1:].decode()
+
+    async def revoke_token(
+        self, jti: str, expire_at: int, family: str | None = None
+    ) -> None:
+        if expire_at <= int(datetime.now(timezone.utc).timestamp()):
             return
-        key = self.__get_key(jti=jti)
-        await redis_client.setex(name=key, value="1", time=ttl)
+        try:
+            await self.breaker.call(self._write_revocation, jti, expire_at, family)
+        except UNAVAILABLE:
+            logger.warning("Blacklist Redis unavailable, revoking %s locally", jti)
+            self._revoke_locally(jti=jti, expire_at=expire_at, family=family)
+        else:
+            self._schedule_replay()
+        if self._filter is not None:
+            self._filter.add(jti)
+
+    async def _write_revocation(
+        self, jti: str, expire_at: int, family: str | None
+    ) -> None:
+        ttl = max(1, expire_at - int(datetime.now(timezone.utc).timestamp()))
+        async with self._client.pipeline(transaction=False) as pipe:
+            if self.backend == "keys":
+                pipe.setex(name=self.__get_key(jti=jti), value="1", time=ttl)
+            else:
+                # The whole bucket expires with its latest possible token.
+                bucket = self.__get_bucket(expire_at=expire_at)
+                key = f"{self.BUCKET_PREFIX}{bucket}"
+                pipe.sadd(key, self._member(jti=jti))
+                pipe.expireat(name=key, when=(bucket + 1) * self.bucket_seconds)
+            if family is not None:
+                pipe.setex(
+                    name=self.__get_family_key(family=family),
+                    value=self.REVOKED,
+                    time=ttl,
+                )
+            pipe.xadd(
+                name=self.FEED_KEY,
+                fields={"jti": jti},
+                maxlen=settings.BLACKLIST_FEED_MAXLEN,
+                approximate=True,
+            )
+            with revoke_seconds.time():
+                await pipe.execute()
+
+    async def rotate(
+        self,
+        jti: str,
+        expire_at: int,
+        new_jti: str,
+        family: str,
+        family_expire_at: int,
+        ancestors: list[tuple[str, int]] = (),
+    ) -> str:
+        # ROTATED_LOCALLY means Redis has not seen this rotation yet: the new token
+        # must carry ancestors + [(jti, expire_at)] so any worker can accept it.
+        try:
+            status = await self.breaker.call(
+                self._write_rotation,
+                jti,
+                expire_at,
+                new_jti,
+                family,
+                family_expire_at,
+                ancestors,
+            )
+        except UNAVAILABLE:
+            return self._rotate_locally(
+                jti=jti,
+                expire_at=expire_at,
+                new_jti=new_jti,
+                family=family,
+                family_expire_at=family_expire_at,
+            )
+        self._schedule_replay()
+        return status
+
+    async def _write_rotation(
+        self,
+        jti: str,
+        expire_at: int,
+        new_jti: str,
+        family: str,
+        family_expire_at: int,
+        ancestors: list[tuple[str, int]] = (),
+        replay: bool = False,
+    ) -> str:
+        with rotate_seconds.time():
+            status, revoked_jti = await self._rotate_script(
+                keys=[self.__get_family_key(family=family), self.FEED_KEY],
+                args=[
+                    jti,
+                    expire_at,
+                    new_jti,
+                    family_expire_at,
+                    self.backend,
+                    self.PREFIX if self.backend == "keys" else self.BUCKET_PREFIX,
+                    settings.BLACKLIST_FEED_MAXLEN,
+                    self.bucket_seconds,
+                    int(replay),
+                    *(value for ancestor in ancestors for value in ancestor),
+                ],
+            )
+        if isinstance(status, bytes):
+            status = status.decode()
+            revoked_jti = revoked_jti.decode() if revoked_jti else revoked_jti
+        if revoked_jti and self._filter is not None:
+            self._filter.add(revoked_jti)
+        return status
 
-    async def is_revoked(self, jti: str) -> bool:
-        key = self.__get_key(jti=jti)
-        is_revoked = await redis_client.get(name=key) is not None
+    async def is_revoked(self, jti: str, expire_at: int) -> bool:
+        if self._is_revoked_locally(self.__get_key(jti=jti)):
+            return True
+        bloom = self._filter
+        if bloom is not None and jti not in bloom:
+            self.filter_negatives += 1
+            return False
+
+        try:
+            is_revoked = await self.breaker.call(self._get, jti, expire_at)
+        except UNAVAILABLE:
+            return self._degraded_answer()
+        if bloom is not None:
+            self.filter_hits += 1
+            if not is_revoked:
+                self.false_positives += 1
         return is_revoked
+
+    async def _get(self, jti: str, expire_at: int) -> bool:
+        key = self.__get_storage_key(jti=jti, expire_at=expire_at)
+        with get_seconds.time():
+            if self.backend == "keys":
+                return await self._client.get(name=key) is not None
+            return bool(await self._client.sismember(key, self._member(jti=jti)))
+
+    async def are_revoked(self, tokens: list[tuple[str, int]]) -> list[bool]:
+        # tokens are (jti, exp) pairs: the bucket backend needs exp to find the set.
+        jtis = [jti for jti, _ in tokens]
+        bloom = self._filter
+        candidates = [
+            index for index, jti in enumerate(jtis) if bloom is None or jti in bloom
+        ]
+        if bloom is not None:
+            self.filter_negatives += len(jtis) - len(candidates)
+
+        revoked = [False] * len(jtis)
+        if self._local:
+            revoked = [self._is_revoked_locally(self.__get_key(jti=jti)) for jti in jtis]
+        if not candidates:
+            return revoked
+
+        try:
+            values = await self.breaker.call(
+                self._mget, [tokens[index] for index in candidates]
+            )
+        except UNAVAILABLE:
+            fallback = self._degraded_answer()
+            return [value or fallback for value in revoked]
+        for index, value in zip(candidates, values):
+            revoked[index] = revoked[index] or value
+            if bloom is not None:
+                self.filter_hits += 1
+                if not value:
+                    self.false_positives += 1
+        return revoked
+
+    async def _mget(self, tokens: list[tuple[str, int]]) -> list[bool]:
+        with mget_seconds.time():
+            if self.backend == "keys":
+                values = await self._client.mget(
+                    [self.__get_key(jti=jti) for jti, _ in tokens]
+                )
+                return [value is not None for value in values]
+            async with self._client.pipeline(transaction=False) as pipe:
+                for jti, expire_at in tokens:
+                    pipe.sismember(
+                        self.__get_storage_key(jti=jti, expire_at=expire_at),
+                        self._member(jti=jti),
+                    )
+                return [bool(value) for value in await pipe.execute()]
+
+    def _degraded_answer(self) -> bool:
+        # Without Redis a token not revoked on this worker may still have been
+        # revoked elsewhere: fail-open accepts it, fail-closed refuses to answer.
+        if self.fail_open:
+            return False
+        raise ServiceUnavailableException(
+            detail="Token revocation store is unavailable",
+            retry_after=max(1, int(settings.BLACKLIST_BREAKER_RESET_SEC)),
+        )
+
+    def _is_revoked_locally(self, key: str) -> bool:
+        if not self._local:
+            return False
+        expire_at = self._local.get(key)
+        return expire_at is not None and expire_at > time.time()
+
+    def _revoke_locally(
+        self,
+        jti: str,
+        expire_at: int,
+        family: str | None,
+        new_jti: str | None = None,
+        family_expire_at: int | None = None,
+    ) -> None:
+        if len(self._local) >= self.LOCAL_MAX_ENTRIES:
+            now = time.time()
+            self._local = {k: exp for k, exp in self._local.items() if exp > now}
+        self._local[self.__get_key(jti=jti)] = expire_at
+        if family is not None and new_jti is None:
+            self._local[self.__get_family_key(family=family)] = expire_at
+        self._replay_queue.append((jti, expire_at, family, new_jti, family_expire_at))
+        BLACKLIST_REPLAY_QUEUE.inc()
+
+    def _rotate_locally(
+        self, jti: str, expire_at: int, new_jti: str, family: str, family_expire_at: int
+    ) -> str:
+        # Reuse detection needs the family's live jti, which only Redis knows; in
+        # degraded mode we can only refuse tokens this worker has seen revoked.
+        # Two branches of one family forked during the outage are caught once the
+        # slower one refreshes: its chain no longer contains the family's jti.
+        family_key = self.__get_family_key(family=family)
+        if self._is_revoked_locally(self.__get_key(jti=jti)) or self._is_revoked_locally(
+            family_key
+        ):
+            return self.REVOKED
+        if not self.fail_open:
+            self._degraded_answer()
+        logger.warning("Blacklist Redis unavailable, rotating %s locally", jti)
+        self._revoke_locally(
+            jti=jti,
+            expire_at=expire_at,
+            family=family,
+            new_jti=new_jti,
+            family_expire_at=family_expire_at,
+        )
+        if self._filter is not None:
+            self._filter.add(jti)
+        return self.ROTATED_LOCALLY
+
+    def _schedule_replay(self) -> None:
+        if self._replay_queue and (self._replay_task is None or self._replay_task.done()):
+            self._replay_task = asyncio.create_task(self._replay())
+
+    async def _replay(self) -> None:
+        while self._replay_queue:
+            jti, expire_at, family, new_jti, family_expire_at = self._replay_queue[0]
+            expired = expire_at <= int(datetime.now(timezone.utc).timestamp())
+            try:
+                if new_jti is not None:
+                    await self.breaker.call(
+                        self._write_rotation,
+                        jti,
+                        expire_at,
+                        new_jti,
+                        family,
+                        family_expire_at,
+                        (),
+                        True,
+                    )
+                elif not expired:
+                    await self.breaker.call(
+                        self._write_revocation, jti, expire_at, family
+                    )
+            except UNAVAILABLE:
+                logger.warning("Blacklist replay stopped, Redis unavailable")
+                return
+            self._replay_queue.popleft()
+            BLACKLIST_REPLAY_QUEUE.dec()
+            self._local.pop(self.__get_key(jti=jti), None)
+            if family is not None and new_jti is None:
+                self._local.pop(self.__get_family_key(family=family), None)
+
+    def stats(self) -> dict:
+        bloom = self._filter
+        negatives = self.filter_negatives + self.false_positives
+        return {
+            "filter_ready": bloom is not None,
+            "filter_insertions": bloom.count if bloom else 0,
+            "filter_fill_ratio": bloom.fill_ratio if bloom else 0.0,
+            "filter_hits": self.filter_hits,
+            "filter_negatives": self.filter_negatives,
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": (
+                self.false_positives / negatives if negatives else 0.0
+            ),
+            "backend": self.backend,
+            "breaker_state": self.breaker.state,
+            "replay_queue": len(self._replay_queue),
+        }
+
+    async def start(self) -> None:
+        if settings.BLACKLIST_BLOOM_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._replay_task is not None and not self._replay_task.done():
+            self._replay_task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._filter = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._rebuild()
+                rebuild_at = time.monotonic() + settings.BLACKLIST_BLOOM_REBUILD_SEC
+                while time.monotonic() < rebuild_at:
+                    await self._follow_feed()
+            except (RedisError, OSError):
+                # Until the filter is rebuilt every lookup goes to Redis.
+                self._filter = None
+                logger.warning("Blacklist filter lost Redis, retrying", exc_info=True)
+                await asyncio.sleep(1)
+
+    async def _rebuild(self) -> None:
+        # Remember the feed position first so revocations racing the scan are replayed.
+        last = await redis_client.xrevrange(name=self.FEED_KEY, count=1)
+        feed_id = last[0][0] if last else "0-0"
+
+        if self.backend == "keys":
+            jtis = [
+                key[len(self.PREFIX) :]
+                async for key in redis_client.scan_iter(
+                    match=f"{self.PREFIX}*", count=1000
+                )
+            ]
+        else:
+            # A handful of bucket keys instead of one key per revoked token.
+            jtis = [
+                self._decode_member(member)
+                async for bucket in self._client.scan_iter(
+                    match=f"{self.BUCKET_PREFIX}*", count=1000
+                )
+                async for member in self._client.sscan_iter(bucket, count=1000)
+            ]
+        bloom = BloomFilter(
+            capacity=max(settings.BLACKLIST_BLOOM_CAPACITY, 2 * len(jtis)),
+            false_positive_rate=settings.BLACKLIST_BLOOM_FP_RATE,
+        )
+        for jti in jtis:
+            bloom.add(jti)
+
+        self._filter = bloom
+        self._feed_id = feed_id
+
+    async def _follow_feed(self) -> None:
+        response = await redis_client.xread(
+            streams={self.FEED_KEY: self._feed_id}, count=1000, block=5000
+        )
+        if response and await self._feed_trimmed():
+            # MAXLEN dropped revocations this worker never read, only a full scan
+            # can bring them back into the filter.
+            await self._rebuild()
+            return
+        for _, entries in response:
+            for entry_id, fields in entries:
+                self._filter.add(fields["jti"])
+                self._feed_id = entry_id
+
+    async def _feed_trimmed(self) -> bool:
+        # Trimming removes the oldest entries first, so once the first entry left is
+        # newer than the last one read, whatever lay in between is gone.
+        info = await redis_client.xinfo_stream(name=self.FEED_KEY)
+        if info["first-entry"] is None:
+            return False
+        return self._stream_id(info["first-entry"][0]) > self._stream_id(self._feed_id)
+
+    @staticmethod
+    def _stream_id(entry_id: str) -> tuple[int, int]:
+        milliseconds, _, sequence = entry_id.partition("-")
+        return int(milliseconds), int(sequence or 0)
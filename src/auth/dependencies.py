@@ -2,17 +2,20 @@ from fastapi import Depends
 from typing import Annotated
 from fastapi.security import OAuth2PasswordBearer
 
-from src.permissions.dependencies import GetPermissionServiceDep
+from src.permissions.registry import permission_registry
 from src.permissions.service import PermissionService
 from src.auth.exceptions import AccountDeactivatedException
+from src.auth.principal import Principal
 from src.auth.service import AuthService
+from src.metrics.collectors import DEPENDENCY_SECONDS
 from src.users.dependencies import GetUserServiceDep
-from src.auth.service import AuthService
-from src.users.models import User
 from src.users.service import UserService
 
 security_bearer_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
+authenticate_user_seconds = DEPENDENCY_SECONDS.labels(dependency="AuthenticateUserDep")
+permission_seconds = DEPENDENCY_SECONDS.labels(dependency="PermissionDep")
+
 
 async def GetAuthServiceDep(
     user_service: Annotated[UserService, Depends(GetUserServiceDep)],
@@ -23,8 +26,9 @@ async def GetAuthServiceDep(
 async def AuthenticateUserDep(
     token: Annotated[str, Depends(security_bearer_scheme)],
     auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
-) -> User:
-    current_user = await auth_service.get_current_user(token=token)
+) -> Principal:
+    with authenticate_user_seconds.time():
+        current_user = await auth_service.get_current_user(token=token)
     if not current_user.is_active:
         raise AccountDeactivatedException()
     return current_user
@@ -34,16 +38,37 @@ class PermissionDep:
     def __init__(self, permissions: list[str], required_all: bool = True) -> None:
         self.permissions = permissions
         self.required_all = required_all
+        self.required_mask = permission_registry.mask(permissions)
 
     async def __call__(
         self,
-        current_user: Annotated[User, Depends(AuthenticateUserDep)],
-        permission_service: Annotated[
-            PermissionService, Depends(GetPermissionServiceDep)
-        ],
+        token: Annotated[str, Depends(security_bearer_scheme)],
+        auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
     ) -> None:
-        await permission_service.check_permissions(
-            role=current_user.role,
-            permissions=self.permissions,
+        with permission_seconds.time():
+            payload = await auth_service.authenticate(token=token)
+
+            role_mask = await auth_service.get_token_role_mask(payload=payload)
+            if role_mask is None:
+                role_mask = await self._get_principal_role_mask(
+                    sub=payload["sub"], auth_service=auth_service
+                )
+
+        PermissionService.check_permissions(
+            role_mask=role_mask,
+            required_mask=self.required_mask,
             required_all=self.required_all,
         )
+
+    @staticmethod
+    async def _get_principal_role_mask(sub: str, auth_service: AuthService) -> int:
+        current_user = await auth_service.get_principal(sub=sub)
+        if not current_user.is_active:
+            raise AccountDeactivatedException()
+
+        role_mask = permission_registry.role_mask(role_id=current_user.role_id)
+        if role_mask is None:
+            role_mask = permission_registry.set_role(
+                role_id=current_user.role_id, names=current_user.permissions
+            )
+        return role_mask
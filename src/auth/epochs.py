@@ -0,0 +1,26 @@
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+
+from src.exceptions.exceptions import ServiceUnavailableException
+
+from src.permissions.versions import VersionStore
+
+# Every token carries the epoch of its user at issue time ("ep"); bumping the epoch
+# revokes all of the user's outstanding tokens at once.
+user_epochs = VersionStore(
+    prefix="auth:user_epoch:",
+    backend=settings.USER_EPOCH_BACKEND,
+    cache_ttl_seconds=settings.USER_EPOCH_CACHE_TTL_SEC,
+)
+
+
+async def revoke_user_sessions(user_id: int) -> None:
+    # Unlike reads, which fail open, a bump that did not happen must not look like
+    # one: the caller gets a 503 instead of sessions that silently stay valid.
+    try:
+        await user_epochs.bump(id=user_id)
+    except RedisError:
+        raise ServiceUnavailableException(
+            detail="Sessions could not be revoked", retry_after=1
+        )
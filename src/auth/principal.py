@@ -0,0 +1,105 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from src.core.config import settings
+from src.metrics.collectors import CACHE_STATS
+from src.users.models import User
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    is_active: bool
+    role_id: int
+    role_name: str
+    permissions: frozenset[str]
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            is_active=user.is_active,
+            role_id=user.role.id,
+            role_name=user.role.name,
+            permissions=frozenset(
+                permission.name for permission in user.role.permissions
+            ),
+        )
+
+
+class PrincipalCache:
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # Bumped on every invalidation so that a principal loaded from the DB
+        # concurrently with a write is not stored after the write invalidated it.
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[float, Principal]] = OrderedDict()
+
+    def get(self, sub: str) -> Principal | None:
+        entry = self._entries.get(sub)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, principal = entry
+        if expires_at <= time.monotonic():
+            del self._entries[sub]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(sub)
+        self.hits += 1
+        return principal
+
+    def set(self, sub: str, principal: Principal, generation: int) -> None:
+        if generation != self.generation or self.max_size <= 0:
+            return
+        self._entries[sub] = (time.monotonic() + self.ttl_seconds, principal)
+        self._entries.move_to_end(sub)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.generation += 1
+        self._entries.pop(str(user_id), None)
+
+    def invalidate_role(self, role_id: int) -> None:
+        self.generation += 1
+        stale = [sub for sub, (_, p) in self._entries.items() if p.role_id == role_id]
+        for sub in stale:
+            del self._entries[sub]
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+principal_cache = PrincipalCache(
+    max_size=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SEC,
+)
+
+CACHE_STATS.add(
+    prefix="principal_cache",
+    documentation="Principal cache",
+    stats=principal_cache.stats,
+    fields={
+        "size": "gauge",
+        "hits": "counter",
+        "misses": "counter",
+        "hit_ratio": "gauge",
+    },
+)
@@ -0,0 +1,129 @@
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from hashlib import blake2b
+
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.redis import redis_client
+from src.exceptions.exceptions import TooManyRequestsException
+from src.metrics.collectors import RATE_LIMIT_REJECTED
+
+logger = logging.getLogger(__name__)
+
+# Checks every window first and records the attempt in all of them only if none
+# is full, so a rejected attempt never extends its own lockout. Returns 0 when
+# allowed, otherwise the milliseconds until the oldest attempt leaves the window.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[i * 2])
+    local window = tonumber(ARGV[i * 2 + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[i * 2 + 1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimit:
+    scope: str
+    key: str
+    limit: int
+    window_seconds: int
+
+
+class SlidingWindowRateLimiter:
+    PREFIX = "auth:rate_limit:"
+    MEMORY_MAX_KEYS = 100_000
+
+    def __init__(self, backend: str) -> None:
+        if backend not in ("redis", "memory"):
+            raise ValueError(f"Unknown rate limit backend '{backend}'")
+        self.backend = backend
+        self._script = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._memory: OrderedDict[str, deque[float]] = OrderedDict()
+        self._degraded = False
+
+    def __get_key(self, action: str, limit: RateLimit) -> str:
+        # Emails are hashed so the limiter does not keep addresses in Redis.
+        digest = blake2b(limit.key.encode(), digest_size=12).hexdigest()
+        return f"{self.PREFIX}{action}:{limit.scope}:{digest}"
+
+    async def hit(self, action: str, limits: list[RateLimit]) -> None:
+        limits = [limit for limit in limits if limit.limit > 0]
+        if not limits:
+            return
+
+        retry_after_ms = None
+        if self.backend == "redis":
+            args: list[str | int] = [uuid.uuid4().hex]
+            for limit in limits:
+                args.extend((limit.limit, limit.window_seconds * 1000))
+            try:
+                retry_after_ms = await self._script(
+                    keys=[self.__get_key(action, limit) for limit in limits], args=args
+                )
+            except RedisError:
+                # Logged on the switch only, not on every request of the outage.
+                if not self._degraded:
+                    self._degraded = True
+                    logger.warning(
+                        "Rate limiter lost Redis, using local windows", exc_info=True
+                    )
+            else:
+                if self._degraded:
+                    self._degraded = False
+                    logger.warning("Rate limiter reconnected to Redis")
+        if retry_after_ms is None:
+            retry_after_ms = self._hit_memory(action=action, limits=limits)
+
+        if retry_after_ms:
+            RATE_LIMIT_REJECTED.labels(action=action).inc()
+            raise TooManyRequestsException(retry_after=math.ceil(retry_after_ms / 1000))
+
+    def _hit_memory(self, action: str, limits: list[RateLimit]) -> int:
+        # Per-process fallback: limits are only enforced per worker while Redis is down.
+        now = time.monotonic()
+        windows = []
+        retry_after = 0.0
+        for limit in limits:
+            key = self.__get_key(action, limit)
+            window = self._memory.get(key)
+            if window is None:
+                window = self._memory[key] = deque()
+            self._memory.move_to_end(key)
+            while window and window[0] <= now - limit.window_seconds:
+                window.popleft()
+            if len(window) >= limit.limit:
+                retry_after = max(retry_after, window[0] + limit.window_seconds - now)
+            windows.append(window)
+
+        while len(self._memory) > self.MEMORY_MAX_KEYS:
+            self._memory.popitem(last=False)
+
+        if retry_after > 0:
+            return math.ceil(retry_after * 1000)
+        for window in windows:
+            window.append(now)
+        return 0
+
+
+rate_limiter = SlidingWindowRateLimiter(backend=settings.RATE_LIMIT_BACKEND)
@@ -1,28 +1,47 @@
 from fastapi import APIRouter, Body, Depends, Request, Response
+from fastapi.responses import JSONResponse
 from typing import Annotated
 
-from src.auth.dependencies import GetAuthServiceDep
+from src.auth.dependencies import AuthenticateUserDep, GetAuthServiceDep, PermissionDep
+from src.auth.principal import Principal
 from src.auth.service import AuthService
 from src.auth.schemas import (
     AuthCredentialsSchema,
+    IntrospectRequestSchema,
+    IntrospectResponseSchema,
     LogoutResponseSchema,
     TokenResponseSchema,
 )
 
+from src.core.config import settings
+from src.core.jwt import key_ring
+
 from src.users.schemas import UserCreateSchema, UserResponseSchema
 
 
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
+well_known_router = APIRouter(prefix="/.well-known", tags=["Auth"])
+
+
+@well_known_router.get("/jwks.json", status_code=200)
+async def jwks():
+    return JSONResponse(
+        content=key_ring.jwks,
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_CACHE_MAX_AGE_SEC}"},
+    )
 
 
 @router.post("/login", response_model=TokenResponseSchema, status_code=200)
 async def login(
+    request: Request,
     response: Response,
     auth_credetials: Annotated[AuthCredentialsSchema, Body()],
     auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
 ):
-    return await auth_service.login(credentials=auth_credetials, response=response)
+    return await auth_service.login(
+        credentials=auth_credetials, request=request, response=response
+    )
 
 
 @router.post("/register", response_model=UserResponseSchema, status_code=201)
@@ -49,3 +68,25 @@ async def logout(
     auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
 ):
     return await auth_service.logout(request=request, response=response)
+
+
+@router.post("/logout-all", response_model=LogoutResponseSchema, status_code=200)
+async def logout_all(
+    response: Response,
+    current_user: Annotated[Principal, Depends(AuthenticateUserDep)],
+    auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
+):
+    return await auth_service.logout_all(user_id=current_user.id, response=response)
+
+
+@router.post(
+    "/introspect",
+    response_model=IntrospectResponseSchema,
+    status_code=200,
+    dependencies=[Depends(PermissionDep(["auth:introspect"]))],
+)
+async def introspect(
+    introspect_data: Annotated[IntrospectRequestSchema, Body()],
+    auth_service: Annotated[AuthService, Depends(GetAuthServiceDep)],
+):
+    return await auth_service.introspect(tokens=introspect_data.tokens)
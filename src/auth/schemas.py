@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from src.core.config import settings
 
 
 class AuthCredentialsSchema(BaseModel):
@@ -13,3 +15,19 @@ class TokenResponseSchema(BaseModel):
 
 class LogoutResponseSchema(BaseModel):
     message: str = "Logged out"
+
+
+class IntrospectRequestSchema(BaseModel):
+    tokens: list[str] = Field(min_length=1, max_length=settings.INTROSPECT_MAX_TOKENS)
+
+
+class TokenIntrospectionSchema(BaseModel):
+    active: bool
+    sub: str | None = None
+    exp: int | None = None
+    type: str | None = None
+    revoked: bool = False
+
+
+class IntrospectResponseSchema(BaseModel):
+    results: list[TokenIntrospectionSchema]
@@ -1,64 +1,166 @@
 from jwt import ExpiredSignatureError, InvalidTokenError
 from fastapi import Request, Response
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
 
 from src.auth.blacklist import TokensRedisBlacklist
+from src.auth.epochs import revoke_user_sessions, user_epochs
 from src.auth.exceptions import UnauthorizedException
+from src.auth.principal import Principal, principal_cache
+from src.auth.rate_limit import RateLimit, rate_limiter
+from src.auth.token_cache import verified_tokens
 from src.auth.schemas import (
     AuthCredentialsSchema,
+    IntrospectResponseSchema,
+    TokenIntrospectionSchema,
     LogoutResponseSchema,
     TokenResponseSchema,
 )
 
 from src.core.jwt import decode_token, generate_access_token, generate_refresh_token
-from src.core.security import verify_password
+from src.core.security import (
+    hash_password_async,
+    password_needs_update,
+    verify_password_async,
+)
 from src.core.config import settings
 
+from src.exceptions.exceptions import ServiceUnavailableException
+
+from src.metrics.collectors import CACHE_STATS
+
+from src.permissions.registry import permission_registry
+from src.permissions.sync import role_permissions_sync
+from src.permissions.versions import role_versions
+
 from src.users.schemas import UserCreateSchema
 from src.users.service import UserService
 from src.users.models import User
 
 
 blacklist = TokensRedisBlacklist()
+CACHE_STATS.add(
+    prefix="blacklist",
+    documentation="Blacklist Bloom filter",
+    stats=blacklist.stats,
+    fields={
+        "filter_ready": "gauge",
+        "filter_insertions": "gauge",
+        "filter_fill_ratio": "gauge",
+        "filter_hits": "counter",
+        "filter_negatives": "counter",
+        "false_positives": "counter",
+        "observed_false_positive_rate": "gauge",
+    },
+)
 
 
 class AuthService:
     def __init__(self, user_service: UserService) -> None:
         self.user_service = user_service
 
-    @staticmethod
-    def issue_access_token(sub: int) -> str:
-        payload = {"sub": str(sub)}
+    async def issue_access_token(self, sub: int, role_id: int, epoch: int) -> str:
+        payload = {"sub": str(sub), "ep": epoch}
+        if settings.JWT_EMBED_PERMISSIONS:
+            payload.update(await self._authorization_claims(sub=sub, role_id=role_id))
         access_token = generate_access_token(payload=payload)
         return access_token
-    
+
+    async def _authorization_claims(self, sub: int, role_id: int) -> dict:
+        # The version is read before the grants, so a concurrent change either lands
+        # in the grants we read or bumps the version past the one we embed.
+        version = await role_versions.get(id=role_id, fresh=True)
+        if version is None:
+            return {}
+
+        current_role_id, grants = await self.user_service.get_role_grants(
+            user_id=int(sub)
+        )
+        if current_role_id != role_id:
+            return {}
+
+        return {
+            "rid": role_id,
+            "perms": permission_registry.encode(grants=grants),
+            "rv": version,
+        }
+
+    async def get_token_role_mask(self, payload: dict) -> int | None:
+        if not settings.JWT_EMBED_PERMISSIONS or "perms" not in payload:
+            return None
+
+        version = await role_versions.get(id=payload["rid"])
+        if version is None or version != payload["rv"]:
+            return None
+        return permission_registry.decode(encoded=payload["perms"])
+
     @staticmethod
-    def issue_refresh_token(sub: int) -> str:
-        payload = {"sub": str(sub)}
-        refresh_token = generate_refresh_token(payload=payload)
+    def issue_refresh_token(
+        sub: int,
+        jti: str,
+        family: str,
+        epoch: int,
+        ancestors: list[tuple[str, int]] | None = None,
+    ) -> str:
+        payload = {"sub": str(sub), "fam": family, "ep": epoch}
+        if ancestors:
+            payload["anc"] = ancestors
+        refresh_token = generate_refresh_token(payload=payload, jti=jti)
         return refresh_token
 
     @staticmethod
     def decode_token(token: str) -> dict:
+        if (payload := verified_tokens.get(token)) is not None:
+            return payload
         try:
             payload = decode_token(token)
             sub = payload.get("sub")
             if not sub:
                 raise UnauthorizedException(detail="Incorrect token payload")
-            return payload
         except ExpiredSignatureError:
             raise UnauthorizedException(detail="Token expired")
         except InvalidTokenError:
             raise UnauthorizedException(detail="Invalid token")
+        # Refresh tokens are presented once per rotation, caching them buys nothing.
+        if payload.get("type") == "access":
+            verified_tokens.set(token, payload)
+        return payload
+
+    @staticmethod
+    async def check_epoch(payload: dict, fresh: bool = False) -> int | None:
+        # Fails open while Redis is unreachable: deactivation is still enforced by
+        # the is_active check on the principal, which comes from the database.
+        epoch = await user_epochs.get(id=int(payload["sub"]), fresh=fresh)
+        if epoch is not None and payload.get("ep", 0) < epoch:
+            raise UnauthorizedException(detail="Token revoked")
+        return epoch
+
+    async def authenticate(self, token: str) -> dict:
+        payload = self.decode_token(token=token)
+        await self.check_epoch(payload=payload)
+        return payload
 
     async def _validate_credentials(self, credentials: AuthCredentialsSchema) -> User:
         user = await self.user_service.get_by_email(user_email=credentials.email)
-        if not user or not verify_password(
+        if not user or not await verify_password_async(
             password=credentials.password, hashed_password=user.hashed_password
         ):
             raise UnauthorizedException(detail="Incorrect email or password")
+        if password_needs_update(hashed_password=user.hashed_password):
+            await self._rehash_password(user=user, password=credentials.password)
         return user
 
+    async def _rehash_password(self, user: User, password: str) -> None:
+        # Hashes made with stale Argon2 parameters are upgraded while the plaintext
+        # is at hand; if the hash pool is busy it waits for a later login.
+        try:
+            hashed_password = await hash_password_async(password)
+        except ServiceUnavailableException:
+            return
+        await self.user_service.update_password_hash(
+            user_id=user.id, hashed_password=hashed_password
+        )
+
     async def _set_refresh_token_cookie(
         self, refresh_token: str, response: Response
     ) -> None:
@@ -74,20 +176,70 @@ class AuthService:
             ),
         )
 
+    @staticmethod
+    def _client_ip(request: Request) -> str:
+        return request.client.host if request.client else "unknown"
+
     async def refresh(self, request: Request, response: Response) -> TokenResponseSchema:
+        await rate_limiter.hit(
+            action="refresh",
+            limits=[
+                RateLimit(
+                    scope="ip",
+                    key=self._client_ip(request),
+                    limit=settings.REFRESH_RATE_LIMIT_PER_IP,
+                    window_seconds=settings.REFRESH_RATE_LIMIT_WINDOW_SEC,
+                ),
+            ],
+        )
+
         refresh_token = request.cookies.get("refresh_token")
         if not refresh_token:
             raise UnauthorizedException(detail="No refresh token")
 
         payload = self.decode_token(token=refresh_token)
+        if payload.get("type") != "refresh":
+            raise UnauthorizedException(detail="Invalid token")
+        epoch = await self.check_epoch(payload=payload, fresh=True)
+        if epoch is None:
+            epoch = payload.get("ep", 0)
 
-        jti = payload["jti"]
-        if await blacklist.is_revoked(jti=jti):
+        # Tokens issued before families existed start their own family on rotation.
+        family = payload.get("fam", payload["jti"])
+        ancestors = [tuple(ancestor) for ancestor in payload.get("anc", [])]
+        new_jti = str(uuid4())
+        status = await blacklist.rotate(
+            jti=payload["jti"],
+            expire_at=payload["exp"],
+            new_jti=new_jti,
+            family=family,
+            family_expire_at=int(
+                (
+                    datetime.now(timezone.utc)
+                    + timedelta(days=settings.JWT_REFRESH_TOKEN_EXP_DAYS)
+                ).timestamp()
+            ),
+            ancestors=ancestors,
+        )
+        if status == blacklist.REUSED:
+            response.delete_cookie(key="refresh_token", path="/auth")
+            raise UnauthorizedException(detail="Refresh token reuse detected")
+        if status == blacklist.ROTATED:
+            ancestors = []
+        elif status == blacklist.ROTATED_LOCALLY:
+            ancestors = [*ancestors, (payload["jti"], payload["exp"])]
+            ancestors = ancestors[-blacklist.MAX_ANCESTORS :]
+        else:
             raise UnauthorizedException(detail="Refresh token revoked")
 
         sub = payload["sub"]
-        new_access_token = self.issue_access_token(sub=sub)
-        new_refresh_token = self.issue_refresh_token(sub=sub)
+        principal = await self.get_principal(sub=sub)
+        new_access_token = await self.issue_access_token(
+            sub=sub, role_id=principal.role_id, epoch=epoch
+        )
+        new_refresh_token = self.issue_refresh_token(
+            sub=sub, jti=new_jti, family=family, epoch=epoch, ancestors=ancestors
+        )
 
         await self._set_refresh_token_cookie(
             refresh_token=new_refresh_token, response=response
@@ -95,18 +247,63 @@ class AuthService:
 
         return TokenResponseSchema(access_token=new_access_token)
 
-    async def get_current_user(self, token: str) -> User:
-        payload = self.decode_token(token=token)
-        user = await self.user_service.get_by_id(user_id=int(payload["sub"]))
-        return user
+    async def get_current_user(self, token: str) -> Principal:
+        payload = await self.authenticate(token=token)
+        return await self.get_principal(sub=payload["sub"])
+
+    async def get_principal(self, sub: str) -> Principal:
+        if principal := principal_cache.get(sub):
+            return principal
+
+        generation = principal_cache.generation
+        user = await self.user_service.get_by_id(user_id=int(sub))
+        principal = Principal.from_user(user)
+        principal_cache.set(sub, principal, generation=generation)
+        for permission in user.role.permissions:
+            permission_registry.bind(name=permission.name, permission_id=permission.id)
+        # While the Redis sync runs it owns the role table; a DB read racing a
+        # peer's change must not overwrite the newer snapshot.
+        if (
+            not role_permissions_sync.is_running
+            or permission_registry.role_mask(role_id=principal.role_id) is None
+        ):
+            permission_registry.set_role(
+                role_id=principal.role_id, names=principal.permissions
+            )
+        return principal
 
     async def login(
-        self, credentials: AuthCredentialsSchema, response: Response
+        self, credentials: AuthCredentialsSchema, request: Request, response: Response
     ) -> TokenResponseSchema:
+        # Checked before any DB lookup or Argon2 verify, which is what makes login
+        # expensive to abuse.
+        await rate_limiter.hit(
+            action="login",
+            limits=[
+                RateLimit(
+                    scope="ip",
+                    key=self._client_ip(request),
+                    limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+                    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SEC,
+                ),
+                RateLimit(
+                    scope="email",
+                    key=credentials.email.strip().lower(),
+                    limit=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+                    window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SEC,
+                ),
+            ],
+        )
         user = await self._validate_credentials(credentials=credentials)
 
-        access_token = self.issue_access_token(sub=user.id)
-        refresh_token = self.issue_refresh_token(sub=user.id)
+        epoch = await user_epochs.get(id=user.id, fresh=True) or 0
+        access_token = await self.issue_access_token(
+            sub=user.id, role_id=user.role_id, epoch=epoch
+        )
+        jti = str(uuid4())
+        refresh_token = self.issue_refresh_token(
+            sub=user.id, jti=jti, family=jti, epoch=epoch
+        )
 
         await self._set_refresh_token_cookie(
             refresh_token=refresh_token, response=response
@@ -123,11 +320,62 @@ class AuthService:
 
         jti = payload["jti"]
         expires_at = payload["exp"]
-        await blacklist.revoke_token(jti=jti, expire_at=expires_at)
+        await blacklist.revoke_token(
+            jti=jti, expire_at=expires_at, family=payload.get("fam")
+        )
 
         response.delete_cookie(key="refresh_token", path="/auth")
         return LogoutResponseSchema()
 
+    async def logout_all(self, user_id: int, response: Response) -> LogoutResponseSchema:
+        await revoke_user_sessions(user_id=user_id)
+        principal_cache.invalidate_user(user_id=user_id)
+        response.delete_cookie(key="refresh_token", path="/auth")
+        return LogoutResponseSchema(message="Logged out from all sessions")
+
+    async def introspect(self, tokens: list[str]) -> IntrospectResponseSchema:
+        payloads: dict[str, dict | None] = {}
+        for token in tokens:
+            if token in payloads:
+                continue
+            try:
+                payloads[token] = self.decode_token(token=token)
+            except UnauthorizedException:
+                payloads[token] = None
+
+        # Only refresh tokens carry a jti; all of them are checked in one round trip.
+        tokens_to_check = list(
+            {(p["jti"], p["exp"]) for p in payloads.values() if p and "jti" in p}
+        )
+        revoked_jtis = {
+            jti
+            for (jti, _), revoked in zip(
+                tokens_to_check, await blacklist.are_revoked(tokens=tokens_to_check)
+            )
+            if revoked
+        }
+        subs = [int(p["sub"]) for p in payloads.values() if p]
+        epochs = await user_epochs.get_many(ids=subs) or {}
+
+        results = []
+        for token in tokens:
+            payload = payloads[token]
+            if payload is None:
+                results.append(TokenIntrospectionSchema(active=False))
+                continue
+            epoch = epochs.get(int(payload["sub"]), 0)
+            revoked = payload.get("jti") in revoked_jtis or payload.get("ep", 0) < epoch
+            results.append(
+                TokenIntrospectionSchema(
+                    active=not revoked,
+                    sub=payload["sub"],
+                    exp=payload["exp"],
+                    type=payload.get("type"),
+                    revoked=revoked,
+                )
+            )
+        return IntrospectResponseSchema(results=results)
+
     async def register(self, user_data: UserCreateSchema) -> User:
         new_user = await self.user_service.create(user_data=user_data)
         return new_user
@@ -0,0 +1,82 @@
+import sys
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+from src.core.config import settings
+from src.metrics.collectors import CACHE_STATS
+
+
+class VerifiedTokenCache:
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> bytes:
+        return blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, token: str) -> dict | None:
+        key = self._digest(token)
+        payload = self._entries.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+
+        if payload["exp"] <= time.time():
+            # Expired entries fall through to jwt.decode, which reports the expiry.
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Callers get their own dict, so one request cannot change what the next sees.
+        return dict(payload)
+
+    def set(self, token: str, payload: dict) -> None:
+        if self.max_size <= 0:
+            return
+        key = self._digest(token)
+        self._entries[key] = dict(payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def memory_bytes(self) -> int:
+        size = sys.getsizeof(self._entries)
+        for key, payload in self._entries.items():
+            size += sys.getsizeof(key) + sys.getsizeof(payload)
+            size += sum(sys.getsizeof(value) for value in payload.values())
+        return size
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_bytes": self.memory_bytes(),
+        }
+
+
+verified_tokens = VerifiedTokenCache(max_size=settings.VERIFIED_TOKEN_CACHE_MAX_SIZE)
+
+CACHE_STATS.add(
+    prefix="verified_token_cache",
+    documentation="Verified access token cache",
+    stats=verified_tokens.stats,
+    fields={
+        "size": "gauge",
+        "hits": "counter",
+        "misses": "counter",
+        "hit_ratio": "gauge",
+        "memory_bytes": "gauge",
+    },
+)
@@ -0,0 +1,178 @@
+import argparse
+import fcntl
+import json
+import logging
+import os
+import platform
+import statistics
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+from passlib.context import CryptContext
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# OWASP's floor for argon2id; below it more passes do not make up for the memory.
+MIN_MEMORY_MB = 19
+MAX_PARALLELISM = 4
+MAX_ADJUSTMENTS = 5
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+@dataclass(frozen=True, slots=True)
+class Argon2Params:
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+    hash_ms: float
+    cpus: int
+    machine: str
+    calibrated_at: str
+
+    def context_settings(self) -> dict:
+        return {
+            "argon2__rounds": self.time_cost,
+            "argon2__memory_cost": self.memory_cost,
+            "argon2__parallelism": self.parallelism,
+        }
+
+    def matches_host(self) -> bool:
+        return self.cpus == _cpu_count() and self.machine == platform.machine()
+
+
+def load_params(path: Path) -> Argon2Params | None:
+    try:
+        return Argon2Params(**json.loads(path.read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        return None
+    except (json.JSONDecodeError, TypeError):
+        logger.warning("Ignoring unreadable Argon2 parameters in %s", path, exc_info=True)
+        return None
+
+
+def save_params(params: Argon2Params, path: Path) -> None:
+    # Written aside under a unique name and renamed, so a worker starting mid-write
+    # never reads half a file and concurrent writers never share a temp file.
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(json.dumps(asdict(params), indent=2))
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def ensure_params(
+    path: Path, min_ms: int, max_ms: int, max_memory_mb: int, force: bool = False
+) -> Argon2Params:
+    # Workers starting together take turns: the first calibrates on an otherwise
+    # idle CPU, the rest find its result once they get the lock, so every worker
+    # runs with the same parameters and agrees on which hashes need an update.
+    with open(path.with_name(f"{path.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        params = None if force else load_params(path=path)
+        if params is None or not params.matches_host():
+            params = calibrate(min_ms=min_ms, max_ms=max_ms, max_memory_mb=max_memory_mb)
+            save_params(params=params, path=path)
+        return params
+
+
+def _measure(
+    time_cost: int, memory_cost: int, parallelism: int, samples: int = 3
+) -> float:
+    context = CryptContext(
+        schemes=["argon2"],
+        argon2__rounds=time_cost,
+        argon2__memory_cost=memory_cost,
+        argon2__parallelism=parallelism,
+    )
+    durations = []
+    for _ in range(samples):
+        started_at = time.perf_counter()
+        context.hash("calibration-password")
+        durations.append((time.perf_counter() - started_at) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate(min_ms: int, max_ms: int, max_memory_mb: int) -> Argon2Params:
+    cpus = _cpu_count()
+    parallelism = min(MAX_PARALLELISM, cpus)
+    memory_mb = max(MIN_MEMORY_MB, max_memory_mb)
+    time_cost = 1
+    elapsed = _measure(time_cost, memory_mb * 1024, parallelism)
+
+    # Memory is the stronger defence, so it is only given up when a single pass at
+    # the cap already misses the window.
+    while elapsed > max_ms and memory_mb > MIN_MEMORY_MB:
+        memory_mb = max(MIN_MEMORY_MB, memory_mb // 2)
+        elapsed = _measure(time_cost, memory_mb * 1024, parallelism)
+
+    # Hash time grows linearly with passes: aim for the middle of the window.
+    target_ms = (min_ms + max_ms) / 2
+    for _ in range(MAX_ADJUSTMENTS):
+        if min_ms <= elapsed <= max_ms:
+            break
+        proposed = max(1, round(target_ms / (elapsed / time_cost)))
+        if proposed == time_cost:
+            break
+        time_cost = proposed
+        elapsed = _measure(time_cost, memory_mb * 1024, parallelism)
+
+    return Argon2Params(
+        time_cost=time_cost,
+        memory_cost=memory_mb * 1024,
+        parallelism=parallelism,
+        hash_ms=round(elapsed, 1),
+        cpus=cpus,
+        machine=platform.machine(),
+        calibrated_at=datetime.now(timezone.utc).isoformat(),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure this host and persist Argon2 cost parameters"
+    )
+    parser.add_argument(
+        "--min-ms", type=int, default=settings.PASSWORD_HASH_TARGET_MIN_MS
+    )
+    parser.add_argument(
+        "--max-ms", type=int, default=settings.PASSWORD_HASH_TARGET_MAX_MS
+    )
+    parser.add_argument(
+        "--max-memory-mb", type=int, default=settings.PASSWORD_HASH_MAX_MEMORY_MB
+    )
+    parser.add_argument(
+        "--output", type=Path, default=Path(settings.PASSWORD_HASH_PARAMS_FILE)
+    )
+    args = parser.parse_args()
+
+    print("Calibration of Argon2 is started...")
+    params = ensure_params(
+        path=args.output,
+        min_ms=args.min_ms,
+        max_ms=args.max_ms,
+        max_memory_mb=args.max_memory_mb,
+        force=True,
+    )
+    print(
+        f"Argon2 parameters are saved to {args.output}: time_cost={params.time_cost} "
+        f"memory_cost={params.memory_cost} parallelism={params.parallelism} "
+        f"hash_ms={params.hash_ms}"
+    )
+
+
+if __name__ == "__main__":
+    main()
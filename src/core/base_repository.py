@@ -1,9 +1,13 @@
 from sqlalchemy import delete, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.core.pagination import Page
+
 
 class SQLARepository:
     model = None
+    page_options = ()
+    row_columns = ()
 
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -12,6 +16,45 @@ class SQLARepository:
         result = await self.session.execute(select(self.model).order_by(self.model.id))
         return result.scalars().all()
 
+    async def get_page(self, limit: int, after: int | None = None) -> Page:
+        # Keyset on the primary key: each page is a range scan on the id index
+        # starting right after the cursor, whatever the page number.
+        query = select(self.model).order_by(self.model.id).limit(limit + 1)
+        if after is not None:
+            query = query.where(self.model.id > after)
+        if self.page_options:
+            query = query.options(*self.page_options)
+        result = await self.session.execute(query)
+        return self._to_page(items=list(result.scalars().all()), limit=limit)
+
+    async def get_rows_page(self, limit: int, after: int | None = None) -> Page:
+        # Same keyset page as get_page, projected to plain dicts without building
+        # ORM instances, for responses written by a RowSerializer.
+        query = self._rows_query().order_by(self.model.id).limit(limit + 1)
+        if after is not None:
+            query = query.where(self.model.id > after)
+        result = await self.session.execute(query)
+        return self._to_rows_page(rows=result.all(), limit=limit)
+
+    def _rows_query(self):
+        return select(*self.row_columns)
+
+    @staticmethod
+    def _to_row(row) -> dict:
+        return row._asdict()
+
+    def _to_rows_page(self, rows: list, limit: int) -> Page:
+        page = self._to_page(items=rows, limit=limit)
+        page.items = [self._to_row(row) for row in page.items]
+        return page
+
+    @staticmethod
+    def _to_page(items: list, limit: int) -> Page:
+        if len(items) > limit:
+            items = items[:limit]
+            return Page(items=items, next_cursor=items[-1].id)
+        return Page(items=items)
+
     async def get(self, id: int):
         result = await self.session.execute(select(self.model).where(self.model.id == id))
         return result.scalar_one_or_none()
@@ -22,6 +65,12 @@ class SQLARepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_ids_by_names(self, names: list[str]) -> dict[str, int]:
+        result = await self.session.execute(
+            select(self.model.name, self.model.id).where(self.model.name.in_(names))
+        )
+        return {name: id for name, id in result.all()}
+
     async def create(self, data: dict):
         new_object = self.model(**data)
         self.session.add(new_object)
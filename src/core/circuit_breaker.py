@@ -0,0 +1,76 @@
+import time
+from typing import Any, Awaitable, Callable
+
+from src.metrics.collectors import CIRCUIT_BREAKER_STATE
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+    STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout_seconds: float,
+        errors: tuple[type[BaseException], ...],
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.errors = errors
+        self.failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._state_gauge = CIRCUIT_BREAKER_STATE.labels(name=name)
+        self._state_gauge.set(0)
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    async def call(
+        self, func: Callable[..., Awaitable], *args: Any, **kwargs: Any
+    ) -> Any:
+        state = self.state
+        # Half-open lets a single probe through; everyone else keeps failing fast
+        # until it tells us whether the dependency is back.
+        if state == self.OPEN or (state == self.HALF_OPEN and self._probing):
+            raise CircuitOpenError(f"Circuit '{self.name}' is open")
+
+        probing = state == self.HALF_OPEN
+        self._probing = probing
+        if probing:
+            self._state_gauge.set(self.STATE_VALUES[self.HALF_OPEN])
+        try:
+            result = await func(*args, **kwargs)
+        except self.errors:
+            self._on_failure(probing=probing)
+            raise
+        finally:
+            if probing:
+                self._probing = False
+        self._on_success()
+        return result
+
+    def _on_failure(self, probing: bool) -> None:
+        self.failures += 1
+        if probing or self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._state_gauge.set(self.STATE_VALUES[self.OPEN])
+
+    def _on_success(self) -> None:
+        if self._opened_at is not None or self.failures:
+            self.failures = 0
+            self._opened_at = None
+            self._state_gauge.set(self.STATE_VALUES[self.CLOSED])
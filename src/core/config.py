@@ -4,12 +4,78 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     SQLITE_DSN: str = "sqlite+aiosqlite:///./database.db"
     REDIS_DSN: str = "redis://localhost:6379/0"
+    SQLITE_PROFILE: str = "default"
+    SQLITE_READ_POOL_SIZE: int | None = None
+    SQLITE_MMAP_SIZE: int = 268_435_456
+    SQLITE_CACHE_SIZE: int = -65_536
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXP_MIN: int = 15
     JWT_REFRESH_TOKEN_EXP_DAYS: int = 7
     JWT_SECRET: str
+    JWT_KEYS_DIR: str = "./keys"
+    JWT_ACTIVE_KID: str | None = None
+    JWKS_CACHE_MAX_AGE_SEC: int = 300
     DEFAULT_USER_ROLE: str
 
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    PASSWORD_HASH_MEMORY_BUDGET_MB: int = 256
+    PASSWORD_HASH_QUEUE_DEADLINE_MS: int = 2000
+    PASSWORD_HASH_PARAMS_FILE: str = "./argon2.json"
+    PASSWORD_HASH_CALIBRATE_ON_STARTUP: bool = False
+    PASSWORD_HASH_TARGET_MIN_MS: int = 200
+    PASSWORD_HASH_TARGET_MAX_MS: int = 500
+    PASSWORD_HASH_MAX_MEMORY_MB: int = 64
+
+    SQL_QUERY_HEADERS: bool = False
+    SQL_QUERY_BUDGET: int | None = None
+    SQL_REPEATED_QUERY_THRESHOLD: int = 3
+
+    RATE_LIMIT_BACKEND: str = "redis"
+    LOGIN_RATE_LIMIT_PER_IP: int = 20
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_WINDOW_SEC: int = 60
+    REFRESH_RATE_LIMIT_PER_IP: int = 60
+    REFRESH_RATE_LIMIT_WINDOW_SEC: int = 60
+
+    WARMUP_ENABLED: bool = True
+    WARMUP_REDIS_CONNECTIONS: int = 8
+    WARMUP_PERMISSIONS_TIMEOUT_SEC: float = 5.0
+
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 500
+
+    BULK_IMPORT_CHUNK_SIZE: int = 500
+    BULK_IMPORT_MAX_ROWS: int = 50_000
+
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SEC: int = 60
+
+    VERIFIED_TOKEN_CACHE_MAX_SIZE: int = 50_000
+    INTROSPECT_MAX_TOKENS: int = 500
+
+    JWT_EMBED_PERMISSIONS: bool = False
+    ROLE_VERSION_BACKEND: str = "redis"
+    ROLE_VERSION_CACHE_TTL_SEC: float = 1.0
+
+    USER_EPOCH_BACKEND: str = "redis"
+    USER_EPOCH_CACHE_TTL_SEC: float = 1.0
+
+    BLACKLIST_BACKEND: str = "keys"
+    BLACKLIST_BUCKET_SEC: int = 3600
+    BLACKLIST_BLOOM_ENABLED: bool = True
+    BLACKLIST_BLOOM_CAPACITY: int = 1_000_000
+    BLACKLIST_BLOOM_FP_RATE: float = 0.001
+    BLACKLIST_BLOOM_REBUILD_SEC: int = 3600
+    BLACKLIST_FEED_MAXLEN: int = 100_000
+    BLACKLIST_REDIS_TIMEOUT_MS: int = 100
+    BLACKLIST_REDIS_MAX_CONNECTIONS: int = 32
+    BLACKLIST_BREAKER_FAILURE_THRESHOLD: int = 5
+    BLACKLIST_BREAKER_RESET_SEC: float = 5.0
+    BLACKLIST_FAIL_MODE: str = "open"
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -1,24 +1,120 @@
+import os
+import time
+
+from sqlalchemy import Engine, event
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from sqlalchemy.sql import Delete, Insert, Update
 
 from src.core.config import settings
+from src.metrics.collectors import DEPENDENCY_SECONDS, SQL_QUERY_SECONDS
+from src.metrics.queries import query_stats
+
+
+def _set_pragmas(engine: Engine, read_only: bool) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+
+def _instrument(engine: Engine, name: str) -> None:
+    query_seconds = SQL_QUERY_SECONDS.labels(engine=name)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+        query_seconds.observe(elapsed)
+        stats = query_stats.get()
+        if stats is not None:
+            stats.record(statement=statement, seconds=elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started_at"):
+            connection.info["query_started_at"].pop()
+
+
+if settings.SQLITE_PROFILE == "production":
+    # SQLite allows one writer at a time: a single writer connection queues writes
+    # in the pool instead of in busy_timeout, while WAL lets readers run alongside.
+    async_engine = create_async_engine(
+        url=settings.SQLITE_DSN, echo=False, pool_size=1, max_overflow=0
+    )
+    async_read_engine = create_async_engine(
+        url=settings.SQLITE_DSN,
+        echo=False,
+        pool_size=settings.SQLITE_READ_POOL_SIZE or os.cpu_count() or 1,
+        max_overflow=0,
+    )
+    _set_pragmas(async_engine.sync_engine, read_only=False)
+    _set_pragmas(async_read_engine.sync_engine, read_only=True)
+    _instrument(async_engine.sync_engine, name="writer")
+    _instrument(async_read_engine.sync_engine, name="reader")
+else:
+    async_engine = create_async_engine(
+        url=settings.SQLITE_DSN, echo=False, pool_size=5, max_overflow=10
+    )
+    async_read_engine = async_engine
+    _instrument(async_engine.sync_engine, name="default")
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if async_read_engine is async_engine:
+            return async_engine.sync_engine
+        # Once a transaction has written, later reads in it must see those writes,
+        # so they stick to the writer until the transaction ends.
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info["uses_writer"] = True
+        if self.info.get("uses_writer"):
+            return async_engine.sync_engine
+        return async_read_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _release_writer(session: Session, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("uses_writer", None)
 
-async_engine = create_async_engine(
-    url=settings.SQLITE_DSN, echo=False, pool_size=5, max_overflow=10
-)
 
 async_session_factory = async_sessionmaker(
-    bind=async_engine, expire_on_commit=False, class_=AsyncSession
+    bind=async_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
 )
 
 
+get_session_seconds = DEPENDENCY_SECONDS.labels(dependency="get_session")
+
+
 async def get_session():
+    # Only setup and teardown are timed; the handler runs while the generator is paused.
+    started_at = time.perf_counter()
     async with async_session_factory() as session:
+        elapsed = time.perf_counter() - started_at
         try:
             yield session
         except Exception:
             await session.rollback()
             raise
+        finally:
+            started_at = time.perf_counter()
+    get_session_seconds.observe(elapsed + time.perf_counter() - started_at)
 
 
 async def test_db_connection():
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from src.core.database import async_session_factory
+from src.core.security import password_hash_pool
+from src.users.importer import parse_import
+from src.users.repositories import RoleRepository, UserRepository
+from src.users.service import UserService
+
+
+async def import_users(path: Path, import_format: str):
+    print(f"Import of {path} is started...")
+
+    content = path.read_text(encoding="utf-8")
+    rows = parse_import(content=content, import_format=import_format)
+    async with async_session_factory() as session:
+        user_service = UserService(
+            user_repo=UserRepository(session), role_repo=RoleRepository(session)
+        )
+        result = await user_service.import_users(rows=rows)
+
+    for row in result.rows:
+        if row.status != "created":
+            print(f"line {row.line}: {row.status} {row.email or ''} {row.detail or ''}")
+    print(
+        f"Import is completed: created={result.created} "
+        f"duplicates={result.duplicates} invalid={result.invalid}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or NDJSON")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default=None)
+    args = parser.parse_args()
+
+    import_format = args.format or ("csv" if args.path.suffix == ".csv" else "ndjson")
+    try:
+        asyncio.run(import_users(path=args.path, import_format=import_format))
+    finally:
+        password_hash_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
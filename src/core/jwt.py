@@ -3,39 +3,49 @@ from uuid import uuid4
 import jwt
 
 from src.core.config import settings
+from src.core.keys import KeyRing
+
+key_ring = KeyRing.from_settings()
+
+
+def _encode(payload: dict) -> str:
+    key = key_ring.active
+    headers = {"kid": key.kid} if key.kid else None
+    return jwt.encode(
+        payload=payload, key=key.signing_key, algorithm=key.algorithm, headers=headers
+    )
 
 
 def generate_access_token(
     payload: dict,
-    secret: str = settings.JWT_SECRET,
-    algorithm: str = settings.JWT_ALGORITHM,
     expire_minutes: int = settings.JWT_ACCESS_TOKEN_EXP_MIN,
 ) -> str:
     now = datetime.now(timezone.utc)
     expire = now + timedelta(minutes=expire_minutes)
     to_encode = {**payload, "type": "access", "iat": now, "exp": expire}
-    access_token = jwt.encode(payload=to_encode, key=secret, algorithm=algorithm)
+    access_token = _encode(payload=to_encode)
     return access_token
 
 
 def generate_refresh_token(
     payload: dict,
-    secret: str = settings.JWT_SECRET,
-    algorithm: str = settings.JWT_ALGORITHM,
     expire_days: int = settings.JWT_REFRESH_TOKEN_EXP_DAYS,
+    jti: str | None = None,
 ) -> str:
-    jti = str(uuid4())
+    jti = jti or str(uuid4())
     now = datetime.now(timezone.utc)
     expire = now + timedelta(days=expire_days)
     to_encode = {**payload, "type": "refresh", "jti": jti, "iat": now, "exp": expire}
-    refresh_token = jwt.encode(payload=to_encode, key=secret, algorithm=algorithm)
+    refresh_token = _encode(payload=to_encode)
     return refresh_token
 
 
-def decode_token(
-    token: str,
-    secret: str = settings.JWT_SECRET,
-    algorithm: str = settings.JWT_ALGORITHM,
-) -> dict:
-    decoded_token = jwt.decode(jwt=token, key=secret, algorithms=[algorithm])
+def decode_token(token: str) -> dict:
+    kid = jwt.get_unverified_header(token).get("kid")
+    key = key_ring.get(kid)
+    if key is None:
+        raise jwt.InvalidTokenError("Unknown signing key")
+    decoded_token = jwt.decode(
+        jwt=token, key=key.verification_key, algorithms=[key.algorithm]
+    )
     return decoded_token
@@ -0,0 +1,132 @@
+import argparse
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+from src.core.config import settings
+
+ASYMMETRIC_ALGORITHMS = ("EdDSA", "ES256")
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str | None
+    algorithm: str
+    signing_key: Any
+    verification_key: Any
+
+
+def _algorithm_for(public_key: Any) -> str:
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return "EdDSA"
+    if isinstance(public_key, ec.EllipticCurvePublicKey):
+        if public_key.curve.name == "secp256r1":
+            return "ES256"
+    raise ValueError(f"Unsupported signing key type {type(public_key).__name__}")
+
+
+def _load_key(path: Path) -> SigningKey:
+    data = path.read_bytes()
+    kid = path.name.removesuffix(".pem")
+    if b"PRIVATE KEY" in data:
+        private_key = serialization.load_pem_private_key(data, password=None)
+        public_key = private_key.public_key()
+    else:
+        # Public-only files keep retired keys verifiable until their tokens expire.
+        private_key = None
+        public_key = serialization.load_pem_public_key(data)
+    return SigningKey(
+        kid=kid,
+        algorithm=_algorithm_for(public_key),
+        signing_key=private_key,
+        verification_key=public_key,
+    )
+
+
+class KeyRing:
+    def __init__(self, keys: list[SigningKey], active_kid: str | None) -> None:
+        self._keys = {key.kid: key for key in keys}
+        if active_kid not in self._keys:
+            raise ValueError(
+                f"Active signing key '{active_kid}' is not loaded from JWT_KEYS_DIR"
+            )
+        self.active = self._keys[active_kid]
+        if self.active.signing_key is None:
+            raise ValueError(f"Active signing key '{active_kid}' has no private key")
+        self.algorithms = sorted({key.algorithm for key in keys})
+        self.jwks = {"keys": [self._to_jwk(key) for key in keys if key.kid is not None]}
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        if settings.JWT_ALGORITHM not in ASYMMETRIC_ALGORITHMS:
+            secret = SigningKey(
+                kid=None,
+                algorithm=settings.JWT_ALGORITHM,
+                signing_key=settings.JWT_SECRET,
+                verification_key=settings.JWT_SECRET,
+            )
+            return cls(keys=[secret], active_kid=None)
+
+        paths = sorted(Path(settings.JWT_KEYS_DIR).glob("*.pem"))
+        keys = [_load_key(path) for path in paths]
+        if not settings.JWT_ACTIVE_KID:
+            raise ValueError("JWT_ACTIVE_KID is required for asymmetric JWT algorithms")
+        return cls(keys=keys, active_kid=settings.JWT_ACTIVE_KID)
+
+    def get(self, kid: str | None) -> SigningKey | None:
+        return self._keys.get(kid)
+
+    @staticmethod
+    def _to_jwk(key: SigningKey) -> dict:
+        if key.algorithm == "EdDSA":
+            jwk = OKPAlgorithm.to_jwk(key.verification_key, as_dict=True)
+        else:
+            jwk = ECAlgorithm.to_jwk(key.verification_key, as_dict=True)
+        return {**jwk, "kid": key.kid, "alg": key.algorithm, "use": "sig"}
+
+
+def generate_key(algorithm: str, keys_dir: Path, kid: str | None = None) -> Path:
+    if algorithm == "EdDSA":
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    elif algorithm == "ES256":
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        raise ValueError(f"Unsupported algorithm '{algorithm}'")
+
+    kid = kid or datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+    keys_dir.mkdir(parents=True, exist_ok=True)
+    path = keys_dir / f"{kid}.pem"
+    pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as file:
+        file.write(pem)
+    return path
+
+
+def main():
+    # Rotation: generate the key once and ship the same PEM to every replica (it is
+    # published in the JWKS but unused), wait for JWKS caches to expire, switch
+    # JWT_ACTIVE_KID and deploy again, then swap the old key for its public half on
+    # every replica once its tokens expire.
+    parser = argparse.ArgumentParser(description="Generate a JWT signing key")
+    parser.add_argument("--algorithm", choices=ASYMMETRIC_ALGORITHMS, default="EdDSA")
+    parser.add_argument("--kid", default=None)
+    parser.add_argument("--keys-dir", type=Path, default=Path(settings.JWT_KEYS_DIR))
+    args = parser.parse_args()
+
+    path = generate_key(algorithm=args.algorithm, keys_dir=args.keys_dir, kid=args.kid)
+    print(f"Signing key is generated: kid={path.name.removesuffix('.pem')} path={path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+from typing import Annotated, Any, Generic, TypeVar
+
+from fastapi import Query
+from pydantic import BaseModel
+from typing_extensions import TypedDict
+
+from src.core.config import settings
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Page:
+    items: list[Any]
+    next_cursor: int | None = None
+
+
+@dataclass(slots=True)
+class PaginationParams:
+    limit: int
+    after: int | None = None
+
+
+class PageSchema(BaseModel, Generic[T]):
+    items: list[T]
+    next_cursor: int | None = None
+
+    model_config = {"from_attributes": True}
+
+
+class PageRows(TypedDict, Generic[T]):
+    items: list[T]
+    next_cursor: int | None
+
+
+async def PaginationDep(
+    limit: Annotated[
+        int, Query(ge=1, le=settings.PAGINATION_MAX_LIMIT)
+    ] = settings.PAGINATION_DEFAULT_LIMIT,
+    after: Annotated[int | None, Query(ge=0)] = None,
+) -> PaginationParams:
+    return PaginationParams(limit=limit, after=after)
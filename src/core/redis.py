@@ -1,5 +1,30 @@
-from redis.asyncio import from_url
+from redis.asyncio import BlockingConnectionPool, Redis, from_url
 
 from src.core.config import settings
 
 redis_client = from_url(url=settings.REDIS_DSN, encoding="utf-8", decode_responses=True)
+
+
+# The blacklist sits on the refresh/logout path: a bounded pool and tight timeouts
+# make a slow Redis fail fast into the circuit breaker instead of piling up workers.
+def _blacklist_client(decode_responses: bool) -> Redis:
+    return Redis.from_pool(
+        BlockingConnectionPool.from_url(
+            url=settings.REDIS_DSN,
+            max_connections=settings.BLACKLIST_REDIS_MAX_CONNECTIONS,
+            timeout=settings.BLACKLIST_REDIS_TIMEOUT_MS / 1000,
+            socket_timeout=settings.BLACKLIST_REDIS_TIMEOUT_MS / 1000,
+            socket_connect_timeout=settings.BLACKLIST_REDIS_TIMEOUT_MS / 1000,
+            encoding="utf-8",
+            decode_responses=decode_responses,
+        )
+    )
+
+
+blacklist_redis_client = _blacklist_client(decode_responses=True)
+# Used by the "buckets" blacklist backend, whose set members are raw bytes.
+blacklist_binary_redis_client = (
+    _blacklist_client(decode_responses=False)
+    if settings.BLACKLIST_BACKEND == "buckets"
+    else None
+)
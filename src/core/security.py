@@ -1,6 +1,29 @@
+import asyncio
+import math
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+from src.core.argon2_calibration import Argon2Params, ensure_params, load_params
+from src.core.config import settings
+from src.exceptions.exceptions import ServiceUnavailableException
+from src.metrics.collectors import (
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_RUN_SECONDS,
+    PASSWORD_HASH_WAIT_SECONDS,
+)
+
+argon2_params = load_params(path=Path(settings.PASSWORD_HASH_PARAMS_FILE))
+pwd_context = CryptContext(
+    schemes=["argon2"],
+    deprecated="auto",
+    **(argon2_params.context_settings() if argon2_params else {}),
+)
 
 
 def hash_password(password: str) -> str:
@@ -9,3 +32,202 @@ def hash_password(password: str) -> str:
 
 def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(secret=password, hash=hashed_password)
+
+
+def password_needs_update(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hash=hashed_password)
+
+
+def _timed_call(func: Callable, *args: Any) -> tuple[Any, float, float]:
+    # Runs inside the worker, so the start timestamp marks the end of the queue wait.
+    # time.monotonic() is system-wide on Linux, which keeps it comparable across processes.
+    started_at = time.monotonic()
+    result = func(*args)
+    return result, started_at, time.monotonic()
+
+
+class PasswordHashStats:
+    # Smoothing factor for the per-hash run time used to predict queue waits.
+    EWMA_ALPHA = 0.2
+
+    def __init__(self) -> None:
+        self.hash_seconds_ewma: float | None = None
+
+    def observe(self, wait_seconds: float, run_seconds: float) -> None:
+        PASSWORD_HASH_WAIT_SECONDS.observe(wait_seconds)
+        PASSWORD_HASH_RUN_SECONDS.observe(run_seconds)
+        if self.hash_seconds_ewma is None:
+            self.hash_seconds_ewma = run_seconds
+        else:
+            self.hash_seconds_ewma += self.EWMA_ALPHA * (
+                run_seconds - self.hash_seconds_ewma
+            )
+
+
+class PasswordHashPool:
+    def __init__(
+        self,
+        executor_type: str,
+        max_workers: int,
+        max_queue: int,
+        memory_budget_mb: int,
+        hash_memory_mb: int,
+        queue_deadline_seconds: float,
+    ) -> None:
+        if executor_type not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash executor '{executor_type}'")
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.memory_budget_mb = memory_budget_mb
+        self.queue_deadline_seconds = queue_deadline_seconds
+        self.stats = PasswordHashStats()
+        self._executor: Executor | None = None
+        self._waiting = 0
+        self._pending_hashes = 0
+        self.configure(hash_memory_mb=hash_memory_mb)
+
+    def configure(self, hash_memory_mb: int) -> None:
+        # Each running Argon2 hash holds its full memory_cost, so the budget caps how
+        # many may run at once regardless of how many workers exist. Only called
+        # while idle (at startup): the executor is rebuilt with the new slot count.
+        self.slots = max(
+            1, min(self.max_workers, self.memory_budget_mb // max(1, hash_memory_mb))
+        )
+        self._semaphore = asyncio.Semaphore(self.slots)
+        self.shutdown()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.slots)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.slots, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def estimated_wait(self) -> float:
+        hash_seconds = self.stats.hash_seconds_ewma or 0.0
+        return self._pending_hashes / self.slots * hash_seconds
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        PASSWORD_HASH_REJECTED.labels(reason=reason).inc()
+        raise ServiceUnavailableException(
+            detail="Password hashing is overloaded",
+            retry_after=max(1, math.ceil(retry_after)),
+        )
+
+    async def run(self, func: Callable, *args: Any, shed: bool = True) -> Any:
+        if shed:
+            # Shed before queueing: a caller that would wait past the deadline gets
+            # its 503 now instead of holding a connection until it times out.
+            wait_estimate = self.estimated_wait()
+            if self._waiting >= self.max_queue:
+                self._reject(reason="queue_full", retry_after=wait_estimate)
+            if wait_estimate > self.queue_deadline_seconds:
+                self._reject(reason="deadline", retry_after=wait_estimate)
+
+        submitted_at = time.monotonic()
+        self._pending_hashes += 1
+        self._waiting += 1
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        try:
+            if shed:
+                try:
+                    await asyncio.wait_for(
+                        self._semaphore.acquire(), timeout=self.queue_deadline_seconds
+                    )
+                except asyncio.TimeoutError:
+                    self._reject(reason="deadline", retry_after=self.estimated_wait())
+            else:
+                await self._semaphore.acquire()
+        except BaseException:
+            self._pending_hashes -= 1
+            raise
+        finally:
+            self._waiting -= 1
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+
+        PASSWORD_HASH_IN_FLIGHT.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started_at, finished_at = await loop.run_in_executor(
+                self.executor, _timed_call, func, *args
+            )
+        finally:
+            self._semaphore.release()
+            self._pending_hashes -= 1
+            PASSWORD_HASH_IN_FLIGHT.dec()
+
+        self.stats.observe(
+            wait_seconds=max(0.0, started_at - submitted_at),
+            run_seconds=finished_at - started_at,
+        )
+        return result
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hash_pool = PasswordHashPool(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+    memory_budget_mb=settings.PASSWORD_HASH_MEMORY_BUDGET_MB,
+    hash_memory_mb=pwd_context.handler("argon2").memory_cost // 1024,
+    queue_deadline_seconds=settings.PASSWORD_HASH_QUEUE_DEADLINE_MS / 1000,
+)
+
+
+def configure_argon2(params: Argon2Params) -> None:
+    global argon2_params
+    argon2_params = params
+    pwd_context.update(**params.context_settings())
+    password_hash_pool.configure(hash_memory_mb=params.memory_cost // 1024)
+
+
+async def calibrate_argon2() -> Argon2Params:
+    # Persisted parameters are reused until the host changes shape, so only the
+    # first start on new hardware pays for the measurement.
+    if argon2_params is not None and argon2_params.matches_host():
+        return argon2_params
+    params = await asyncio.to_thread(
+        ensure_params,
+        path=Path(settings.PASSWORD_HASH_PARAMS_FILE),
+        min_ms=settings.PASSWORD_HASH_TARGET_MIN_MS,
+        max_ms=settings.PASSWORD_HASH_TARGET_MAX_MS,
+        max_memory_mb=settings.PASSWORD_HASH_MAX_MEMORY_MB,
+    )
+    configure_argon2(params=params)
+    return params
+
+
+async def hash_password_async(password: str) -> str:
+    return await password_hash_pool.run(hash_password, password)
+
+
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    return await password_hash_pool.run(verify_password, password, hashed_password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    # One hash per job and at most one job per slot at a time: a login arriving
+    # mid-import waits behind one hash rather than a batch, and the admission
+    # estimate it is judged by never counts more than that. Bulk jobs are never
+    # shed: they wait their turn instead of failing an import halfway.
+    hashed: list[str] = []
+    window_size = password_hash_pool.slots
+    for start in range(0, len(passwords), window_size):
+        hashed.extend(
+            await asyncio.gather(
+                *(
+                    password_hash_pool.run(hash_password, password, shed=False)
+                    for password in passwords[start : start + window_size]
+                )
+            )
+        )
+    return hashed
@@ -32,7 +32,9 @@ async def start_seed():
                 "permissions:assign": "Назначение прав",
                 "permissions:revoke": "Обнуление прав",
                 "permissions:full_access": "Полный доступ к правам",
+                "users:create": "Создание пользователей",
                 "users:full_access": "Полный доступ к пользователям",
+                "auth:introspect": "Интроспекция токенов",
             }
             permissions_objects = {}
             for name, description in permissions.items():
@@ -52,7 +54,9 @@ async def start_seed():
             admin_role.permissions.extend(
                 [
                     permissions_objects["permissions:full_access"],
+                    permissions_objects["users:create"],
                     permissions_objects["users:full_access"],
+                    permissions_objects["auth:introspect"],
                 ]
             )
             manager_role.permissions.extend([
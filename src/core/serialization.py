@@ -0,0 +1,28 @@
+from pydantic import TypeAdapter
+from starlette.responses import Response
+
+from src.core.pagination import Page, PageRows
+
+
+class PreEncodedJSONResponse(Response):
+    # The body arrives as JSON bytes from a RowSerializer and is sent as is.
+    media_type = "application/json"
+
+
+class RowSerializer:
+    # For read-only responses built from plain SQL rows: the serializers are built
+    # once here and dump_json runs in pydantic-core, skipping the from_attributes
+    # validation, the to-dict pass and the json.dumps FastAPI does per response.
+    def __init__(self, row_type: type) -> None:
+        self._row = TypeAdapter(row_type)
+        self._page = TypeAdapter(PageRows[row_type])
+
+    def response(self, row: dict) -> PreEncodedJSONResponse:
+        return PreEncodedJSONResponse(content=self._row.dump_json(row))
+
+    def page_response(self, page: Page) -> PreEncodedJSONResponse:
+        return PreEncodedJSONResponse(
+            content=self._page.dump_json(
+                {"items": page.items, "next_cursor": page.next_cursor}
+            )
+        )
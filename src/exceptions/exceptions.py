@@ -1,6 +1,11 @@
 from fastapi import HTTPException, status
 
 
+class BadRequestException(HTTPException):
+    def __init__(self, detail: str = "Bad request"):
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
 class NotFoundException(HTTPException):
     def __init__(self, detail: str = "Not found", headers: dict | None = None):
         super().__init__(
@@ -18,6 +23,29 @@ class ForbiddenException(HTTPException):
         super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
 
 
+class TooManyRequestsException(HTTPException):
+    def __init__(self, detail: str = "Too many requests", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
 class InternalServerException(HTTPException):
     def __init__(self, detail: str = "Internal server error"):
         super().__init__(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=detail)
+
+
+class ServiceUnavailableException(HTTPException):
+    def __init__(
+        self,
+        detail: str = "Service temporarily unavailable",
+        retry_after: int | None = None,
+    ):
+        headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            headers=headers,
+        )
@@ -7,4 +7,6 @@ async def app_exceptions_handler(request: Request, exc: Exception) -> JSONRespon
 
 
 async def app_http_exceptions_handler(request: Request, exc: HTTPException) -> JSONResponse:
-    return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+    return JSONResponse(
+        status_code=exc.status_code, content={"detail": exc.detail}, headers=exc.headers
+    )
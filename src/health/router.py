@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+
+from src.exceptions.exceptions import ServiceUnavailableException
+from src.health.warmup import warmup
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live", include_in_schema=False)
+async def live() -> dict:
+    return {"status": "ok"}
+
+
+@router.get("/ready", include_in_schema=False)
+async def ready() -> dict:
+    if not warmup.is_ready:
+        raise ServiceUnavailableException(detail="Not ready", retry_after=1)
+    return {
+        "status": "ready",
+        "warmup_seconds": warmup.seconds,
+        "warmup_steps": warmup.steps,
+        "warmup_failed": warmup.failed,
+    }
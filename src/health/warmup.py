@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from types import SimpleNamespace
+
+from sqlalchemy.orm import configure_mappers
+
+from src.auth.schemas import TokenResponseSchema
+from src.core.config import settings
+from src.core.database import async_engine, async_read_engine
+from src.core.pagination import Page
+from src.core.redis import (
+    blacklist_binary_redis_client,
+    blacklist_redis_client,
+    redis_client,
+)
+from src.core.security import hash_password, password_hash_pool
+from src.metrics.collectors import WARMUP_SECONDS
+from src.permissions.sync import role_permissions_sync
+from src.users.schemas import UserResponseSchema, user_rows
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self) -> None:
+        self.is_ready = False
+        self.seconds: float | None = None
+        self.steps: dict[str, float] = {}
+        self.failed: list[str] = []
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        # Runs beside the server so /health/ready reports 503 until it is done;
+        # the load balancer keeps traffic away from this worker meanwhile.
+        if self._task is None:
+            self._task = asyncio.create_task(self._run_in_background())
+
+    async def stop(self) -> None:
+        self.is_ready = False
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_in_background(self) -> None:
+        seconds = await self.run()
+        print(f"WARMUP COMPLETED in {seconds:.3f}s")
+
+    async def run(self) -> float:
+        started_at = time.perf_counter()
+        steps = (
+            ("mappers", self._configure_mappers),
+            ("database", self._open_database),
+            ("redis", self._open_redis),
+            ("permissions", self._load_permissions),
+            ("serializers", self._exercise_serializers),
+            ("password_hash", self._warm_password_hash),
+        )
+        for name, step in steps:
+            step_started_at = time.perf_counter()
+            try:
+                await step()
+            except Exception:
+                # A dependency that is down now is handled per request by its own
+                # fallback; holding readiness back would turn a blip into an outage.
+                logger.warning("Warm-up step %s failed", name, exc_info=True)
+                self.failed.append(name)
+            self.steps[name] = time.perf_counter() - step_started_at
+            WARMUP_SECONDS.labels(step=name).set(self.steps[name])
+        self.seconds = time.perf_counter() - started_at
+        WARMUP_SECONDS.labels(step="total").set(self.seconds)
+        self.is_ready = True
+        return self.seconds
+
+    @staticmethod
+    async def _configure_mappers() -> None:
+        configure_mappers()
+
+    @staticmethod
+    async def _open_database() -> None:
+        engines = [async_engine]
+        if async_read_engine is not async_engine:
+            engines.append(async_read_engine)
+        for engine in engines:
+            # Held open together so the pool has to create, and then keeps, each one.
+            async with AsyncExitStack() as stack:
+                for _ in range(engine.pool.size()):
+                    connection = await stack.enter_async_context(engine.connect())
+                    await connection.exec_driver_sql("SELECT 1")
+
+    @staticmethod
+    async def _open_redis() -> None:
+        for client in (
+            redis_client,
+            blacklist_redis_client,
+            blacklist_binary_redis_client,
+        ):
+            if client is None:
+                continue
+            pool = client.connection_pool
+            connections = []
+            try:
+                for _ in range(
+                    min(settings.WARMUP_REDIS_CONNECTIONS, pool.max_connections)
+                ):
+                    connections.append(await pool.get_connection())
+            finally:
+                for connection in connections:
+                    await pool.release(connection)
+
+    @staticmethod
+    async def _load_permissions() -> None:
+        if not await role_permissions_sync.wait_loaded(
+            timeout=settings.WARMUP_PERMISSIONS_TIMEOUT_SEC
+        ):
+            await role_permissions_sync.load_from_database()
+
+    @staticmethod
+    async def _exercise_serializers() -> None:
+        # Runs the validation and JSON serialization the hottest responses go
+        # through, on stand-ins shaped like the ORM objects and SQL rows.
+        role = SimpleNamespace(id=0, name="warm-up", description=None)
+        user = SimpleNamespace(
+            id=0, email="warm-up@example.com", full_name="", is_active=True, role=role
+        )
+        UserResponseSchema.model_validate(user).model_dump_json()
+        TokenResponseSchema(access_token="").model_dump_json()
+        row = {**vars(user), "role": vars(role)}
+        user_rows.response(row)
+        user_rows.page_response(Page(items=[row]))
+
+    @staticmethod
+    async def _warm_password_hash() -> None:
+        # One hash per slot starts every worker and loads the Argon2 backend in each.
+        await asyncio.gather(
+            *(
+                password_hash_pool.run(hash_password, "warm-up", shed=False)
+                for _ in range(password_hash_pool.slots)
+            )
+        )
+
+
+warmup = Warmup()
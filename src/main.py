@@ -4,13 +4,27 @@ from fastapi import FastAPI, HTTPException
 from src.exceptions.handlers import app_exceptions_handler, app_http_exceptions_handler
 
 from src.core.database import test_db_connection
-from src.core.redis import redis_client
+from src.core.redis import (
+    blacklist_binary_redis_client,
+    blacklist_redis_client,
+    redis_client,
+)
+from src.core.config import settings
+from src.core.security import calibrate_argon2, password_hash_pool
 
 from src.permissions.router import router as permissions_router
+from src.permissions.sync import role_permissions_sync
 from src.supplies.router import router as supplies_router
 from src.products.router import router as products_router
 from src.users.router import router as users_router
 from src.auth.router import router as auth_router
+from src.auth.router import well_known_router
+from src.auth.service import blacklist
+from src.metrics.collectors import mark_process_dead
+from src.metrics.middleware import MetricsMiddleware
+from src.metrics.router import router as metrics_router
+from src.health.router import router as health_router
+from src.health.warmup import warmup
 
 app = FastAPI()
 
@@ -19,8 +33,28 @@ app = FastAPI()
 async def lifespan(application: FastAPI):
     print("API STARTED")
     await test_db_connection()
+    if settings.PASSWORD_HASH_CALIBRATE_ON_STARTUP:
+        params = await calibrate_argon2()
+        print(
+            f"ARGON2 time_cost={params.time_cost} memory_cost={params.memory_cost} "
+            f"parallelism={params.parallelism} hash_ms={params.hash_ms}"
+        )
+    await role_permissions_sync.start()
+    await blacklist.start()
+    if settings.WARMUP_ENABLED:
+        await warmup.start()
+    else:
+        warmup.is_ready = True
     yield
+    await warmup.stop()
+    await blacklist.stop()
+    await role_permissions_sync.stop()
     await redis_client.close()
+    await blacklist_redis_client.close()
+    if blacklist_binary_redis_client is not None:
+        await blacklist_binary_redis_client.close()
+    password_hash_pool.shutdown()
+    mark_process_dead()
     print("API STOPPED")
 
 
@@ -29,8 +63,13 @@ app = FastAPI(title="API", lifespan=lifespan)
 app.add_exception_handler(Exception, app_exceptions_handler)
 app.add_exception_handler(HTTPException, app_http_exceptions_handler)
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router=auth_router)
+app.include_router(router=well_known_router)
 app.include_router(router=users_router)
 app.include_router(router=permissions_router)
 app.include_router(router=supplies_router)
 app.include_router(router=products_router)
+app.include_router(router=metrics_router)
+app.include_router(router=health_router)
@@ -0,0 +1,148 @@
+import os
+from typing import Callable, Iterator
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+
+# Sub-millisecond buckets for cache/Redis/SQLite hits, up to seconds for Argon2.
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP responses by route template",
+    ["method", "route", "status"],
+)
+DEPENDENCY_SECONDS = Histogram(
+    "dependency_duration_seconds",
+    "Time spent inside request dependencies",
+    ["dependency"],
+    buckets=LATENCY_BUCKETS,
+)
+SQL_QUERY_SECONDS = Histogram(
+    "sql_query_duration_seconds",
+    "SQLAlchemy cursor execution time",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+SQL_QUERIES_PER_REQUEST = Histogram(
+    "sql_queries_per_request",
+    "SQL statements executed per HTTP request",
+    ["route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+SQL_SECONDS_PER_REQUEST = Histogram(
+    "sql_duration_per_request_seconds",
+    "Total SQL time per HTTP request",
+    ["route"],
+    buckets=LATENCY_BUCKETS,
+)
+REDIS_COMMAND_SECONDS = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round-trip time by command",
+    ["component", "command"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_queue_wait_seconds",
+    "Time password hash jobs wait for a worker",
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_RUN_SECONDS = Histogram(
+    "password_hash_duration_seconds",
+    "Time spent hashing or verifying a password",
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total",
+    "Password hash jobs shed by admission control",
+    ["reason"],
+)
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hash jobs waiting for a memory slot",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hash jobs running",
+    multiprocess_mode="livesum",
+)
+CIRCUIT_BREAKER_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    ["name"],
+    multiprocess_mode="livemax",
+)
+BLACKLIST_REPLAY_QUEUE = Gauge(
+    "blacklist_replay_queue_size",
+    "Revocations stored locally and waiting to be replayed to Redis",
+    multiprocess_mode="livesum",
+)
+WARMUP_SECONDS = Gauge(
+    "warmup_duration_seconds",
+    "Time spent in each startup warm-up step",
+    ["step"],
+    multiprocess_mode="livemax",
+)
+RATE_LIMIT_REJECTED = Counter(
+    "rate_limit_rejected_total", "Requests rejected by the rate limiter", ["action"]
+)
+
+
+class StatsCollector(Collector):
+    # Reads the in-process caches' own stats() at scrape time instead of updating
+    # metrics on every lookup. With several workers each scrape reports the worker
+    # that served it.
+    def __init__(self) -> None:
+        self._sources: list[tuple[str, str, Callable[[], dict], dict[str, str]]] = []
+
+    def add(
+        self,
+        prefix: str,
+        documentation: str,
+        stats: Callable[[], dict],
+        fields: dict[str, str],
+    ) -> None:
+        self._sources.append((prefix, documentation, stats, fields))
+
+    def collect(self) -> Iterator[Metric]:
+        for prefix, documentation, stats, fields in self._sources:
+            values = stats()
+            for field, kind in fields.items():
+                family = CounterMetricFamily if kind == "counter" else GaugeMetricFamily
+                yield family(
+                    f"{prefix}_{field}", f"{documentation}: {field}", value=values[field]
+                )
+
+
+CACHE_STATS = StatsCollector()
+REGISTRY.register(CACHE_STATS)
+
+
+def mark_process_dead() -> None:
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
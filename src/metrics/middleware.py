@@ -0,0 +1,63 @@
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.config import settings
+from src.metrics.collectors import (
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+    SQL_QUERIES_PER_REQUEST,
+    SQL_SECONDS_PER_REQUEST,
+)
+from src.metrics.queries import QueryStats, RequestQueries, query_stats, report_queries
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        stats = QueryStats()
+        token = query_stats.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SQL_QUERY_HEADERS:
+                    # Queries issued while the body streams are not counted here.
+                    headers = MutableHeaders(scope=message)
+                    headers["X-SQL-Query-Count"] = str(stats.count)
+                    headers["X-SQL-Query-Time-Ms"] = f"{stats.seconds * 1000:.2f}"
+            await send(message)
+
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            query_stats.reset(token)
+            # Label by route template, not raw path, to keep label cardinality bounded.
+            route = scope.get("route")
+            route_path = route.path if route is not None else "unmatched"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.labels(method, route_path).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route_path, str(status_code)).inc()
+            SQL_QUERIES_PER_REQUEST.labels(route_path).observe(stats.count)
+            SQL_SECONDS_PER_REQUEST.labels(route_path).observe(stats.seconds)
+            report_queries(
+                request=RequestQueries(
+                    method=method,
+                    route=route_path,
+                    status_code=status_code,
+                    stats=stats,
+                ),
+                budget=settings.SQL_QUERY_BUDGET,
+                repeat_threshold=settings.SQL_REPEATED_QUERY_THRESHOLD,
+            )
@@ -0,0 +1,96 @@
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Statements are already parameterized, so the SQL text doubles as its shape.
+    statements: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.seconds += seconds
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class RequestQueries:
+    method: str
+    route: str
+    status_code: int
+    stats: QueryStats
+
+
+# Set per request by the metrics middleware and filled in by the engine events.
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+query_observers: list[Callable[[RequestQueries], None]] = []
+
+
+def report_queries(
+    request: RequestQueries, budget: int | None, repeat_threshold: int
+) -> None:
+    stats = request.stats
+    if budget is not None and stats.count > budget:
+        logger.warning(
+            "%s %s ran %d SQL statements (budget %d)",
+            request.method,
+            request.route,
+            stats.count,
+            budget,
+        )
+    for statement, count in stats.repeated(repeat_threshold).items():
+        logger.warning(
+            "%s %s ran the same statement %d times, possible N+1: %s",
+            request.method,
+            request.route,
+            count,
+            " ".join(statement.split()),
+        )
+    for observer in query_observers:
+        observer(request)
+
+
+@contextmanager
+def capture_queries() -> Iterator[list[RequestQueries]]:
+    captured: list[RequestQueries] = []
+    query_observers.append(captured.append)
+    try:
+        yield captured
+    finally:
+        query_observers.remove(captured.append)
+
+
+@contextmanager
+def assert_query_budget(budget: int, allow_repeats: bool = False) -> Iterator[None]:
+    with capture_queries() as captured:
+        yield
+
+    for request in captured:
+        stats = request.stats
+        repeated = {} if allow_repeats else stats.repeated(threshold=2)
+        if stats.count <= budget and not repeated:
+            continue
+        statements = "\n".join(
+            f"  {count}x {' '.join(statement.split())}"
+            for statement, count in stats.statements.most_common()
+        )
+        raise AssertionError(
+            f"{request.method} {request.route} ran {stats.count} SQL statements "
+            f"(budget {budget}, repeated {len(repeated)}):\n{statements}"
+        )
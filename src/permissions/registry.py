@@ -0,0 +1,93 @@
+from typing import Iterable
+
+
+class PermissionRegistry:
+    def __init__(self) -> None:
+        self._bits: dict[str, int] = {}
+        self._role_masks: dict[int, int] = {}
+        self._names_by_id: dict[int, str] = {}
+        self._decoded: dict[str, int] = {}
+
+    def bit(self, name: str) -> int:
+        # Bits are handed out on first sight and never reused, so a mask compiled
+        # by a dependency at import time stays valid for the life of the process.
+        if (bit := self._bits.get(name)) is None:
+            bit = 1 << len(self._bits)
+            self._bits[name] = bit
+        return bit
+
+    def mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.bit(name)
+        return mask
+
+    def names(self, mask: int) -> list[str]:
+        return [name for name, bit in self._bits.items() if mask & bit]
+
+    def bind(self, name: str, permission_id: int) -> None:
+        if self._names_by_id.get(permission_id) != name:
+            self._names_by_id[permission_id] = name
+            self._decoded.clear()
+
+    def unbind(self, permission_id: int) -> None:
+        if self._names_by_id.pop(permission_id, None) is not None:
+            self._decoded.clear()
+
+    def encode(self, grants: Iterable[tuple[int, str]]) -> str:
+        # Tokens carry a hex mask over Permission.id rather than over local bits:
+        # ids are shared by every worker, local bit order is not.
+        id_mask = 0
+        for permission_id, name in grants:
+            self.bind(name=name, permission_id=permission_id)
+            id_mask |= 1 << permission_id
+        return format(id_mask, "x")
+
+    def decode(self, encoded: str) -> int | None:
+        if (mask := self._decoded.get(encoded)) is not None:
+            return mask
+
+        id_mask = int(encoded, 16)
+        mask = 0
+        while id_mask:
+            lowest = id_mask & -id_mask
+            name = self._names_by_id.get(lowest.bit_length() - 1)
+            if name is None:
+                return None
+            mask |= self.bit(name)
+            id_mask ^= lowest
+
+        if len(self._decoded) >= 1024:
+            self._decoded.clear()
+        self._decoded[encoded] = mask
+        return mask
+
+    def role_mask(self, role_id: int) -> int | None:
+        return self._role_masks.get(role_id)
+
+    def set_role(self, role_id: int, names: Iterable[str]) -> int:
+        mask = self.mask(names)
+        self._role_masks[role_id] = mask
+        return mask
+
+    def drop_role(self, role_id: int) -> None:
+        self._role_masks.pop(role_id, None)
+
+    def grant(self, role_id: int, name: str) -> None:
+        if role_id in self._role_masks:
+            self._role_masks[role_id] |= self.bit(name)
+
+    def revoke(self, role_id: int, name: str) -> None:
+        if role_id in self._role_masks:
+            self._role_masks[role_id] &= ~self.bit(name)
+
+    def drop_permission(self, name: str) -> None:
+        bit = self.bit(name)
+        for role_id in self._role_masks:
+            self._role_masks[role_id] &= ~bit
+
+    def load(self, roles: Iterable[tuple[int, Iterable[str]]]) -> None:
+        self._role_masks = {role_id: self.mask(names) for role_id, names in roles}
+
+
+permission_registry = PermissionRegistry()
@@ -1,6 +1,66 @@
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
 from src.core.base_repository import SQLARepository
+from src.core.pagination import Page
+from src.core.models import RolesPermissions
 from src.permissions.models import Permission
 
 
 class PermissionRepository(SQLARepository):
     model = Permission
+    row_columns = (Permission.id, Permission.name, Permission.description)
+
+    async def get_role_ids(self, id: int) -> list[int]:
+        result = await self.session.execute(
+            select(RolesPermissions.role_id).where(RolesPermissions.permission_id == id)
+        )
+        return list(result.scalars().all())
+
+    async def get_role_rows_page(
+        self, role_id: int, limit: int, after: int | None = None
+    ) -> Page:
+        # Filtering and ordering both run on the (role_id, permission_id) primary
+        # key of roles_permissions; permissions are then fetched by id.
+        query = (
+            self._rows_query()
+            .join(RolesPermissions, RolesPermissions.permission_id == self.model.id)
+            .where(RolesPermissions.role_id == role_id)
+            .order_by(RolesPermissions.permission_id)
+            .limit(limit + 1)
+        )
+        if after is not None:
+            query = query.where(RolesPermissions.permission_id > after)
+        result = await self.session.execute(query)
+        return self._to_rows_page(rows=result.all(), limit=limit)
+
+    async def add_role_grants(
+        self, role_ids: list[int], permission_ids: list[int], chunk_size: int = 5000
+    ) -> int:
+        pairs = [
+            {"role_id": role_id, "permission_id": permission_id}
+            for role_id in role_ids
+            for permission_id in permission_ids
+        ]
+        added = 0
+        for start in range(0, len(pairs), chunk_size):
+            result = await self.session.execute(
+                insert(RolesPermissions)
+                .values(pairs[start : start + chunk_size])
+                .on_conflict_do_nothing()
+            )
+            added += result.rowcount
+        return added
+
+    async def remove_role_grants(
+        self, role_ids: list[int], permission_ids: list[int]
+    ) -> int:
+        # The request is a full roles x permissions matrix, so two IN lists select
+        # exactly the (role_id, permission_id) pairs and stay on the primary key.
+        result = await self.session.execute(
+            delete(RolesPermissions).where(
+                RolesPermissions.role_id.in_(role_ids),
+                RolesPermissions.permission_id.in_(permission_ids),
+            )
+        )
+        return result.rowcount
@@ -5,21 +5,26 @@ from src.permissions.dependencies import GetPermissionServiceDep
 from src.permissions.service import PermissionService
 from src.permissions.schemas import (
     AssignPermissionSchema,
+    BulkPermissionsResultSchema,
+    BulkPermissionsSchema,
     PermissionCreateSchema,
     PermissionDeleteSchema,
     PermissionResponseSchema,
     RevokePermissionSchema,
+    permission_rows,
 )
 
 from src.auth.dependencies import PermissionDep
 
+from src.core.pagination import PageSchema, PaginationDep, PaginationParams
+
 
 router = APIRouter(prefix="/permissions", tags=["Permissions"])
 
 
 @router.get(
     "",
-    response_model=list[PermissionResponseSchema],
+    response_model=PageSchema[PermissionResponseSchema],
     status_code=200,
     dependencies=[
         Depends(
@@ -30,14 +35,17 @@ router = APIRouter(prefix="/permissions", tags=["Permissions"])
     ],
 )
 async def get_all_permissions(
+    pagination: Annotated[PaginationParams, Depends(PaginationDep)],
     permission_service: Annotated[PermissionService, Depends(GetPermissionServiceDep)],
 ):
-    return await permission_service.get_all()
+    return permission_rows.page_response(
+        await permission_service.get_all(pagination=pagination)
+    )
 
 
 @router.get(
     "/{role_name}",
-    response_model=list[PermissionResponseSchema],
+    response_model=PageSchema[PermissionResponseSchema],
     status_code=200,
     dependencies=[
         Depends(
@@ -49,9 +57,14 @@ async def get_all_permissions(
 )
 async def get_role_permissions(
     role_name: Annotated[str, Path()],
+    pagination: Annotated[PaginationParams, Depends(PaginationDep)],
     permission_service: Annotated[PermissionService, Depends(GetPermissionServiceDep)],
 ):
-    return await permission_service.get_role_permissions(role_name=role_name)
+    return permission_rows.page_response(
+        await permission_service.get_role_permissions(
+            role_name=role_name, pagination=pagination
+        )
+    )
 
 
 @router.post(
@@ -73,6 +86,44 @@ async def create_permission(
     return await permission_service.create(permission_data)
 
 
+@router.post(
+    "/bulk-assign",
+    response_model=BulkPermissionsResultSchema,
+    status_code=200,
+    dependencies=[
+        Depends(
+            PermissionDep(
+                ["permissions:assign", "permissions:full_access"], required_all=False
+            )
+        )
+    ],
+)
+async def bulk_assign_permissions(
+    matrix: Annotated[BulkPermissionsSchema, Body()],
+    permission_service: Annotated[PermissionService, Depends(GetPermissionServiceDep)],
+):
+    return await permission_service.bulk_assign(matrix=matrix)
+
+
+@router.post(
+    "/bulk-revoke",
+    response_model=BulkPermissionsResultSchema,
+    status_code=200,
+    dependencies=[
+        Depends(
+            PermissionDep(
+                ["permissions:revoke", "permissions:full_access"], required_all=False
+            )
+        )
+    ],
+)
+async def bulk_revoke_permissions(
+    matrix: Annotated[BulkPermissionsSchema, Body()],
+    permission_service: Annotated[PermissionService, Depends(GetPermissionServiceDep)],
+):
+    return await permission_service.bulk_revoke(matrix=matrix)
+
+
 @router.post(
     "/{role_name}/assign",
     response_model=list[PermissionResponseSchema],
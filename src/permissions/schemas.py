@@ -1,5 +1,8 @@
 from pydantic import BaseModel
 from pydantic_settings import SettingsConfigDict
+from typing_extensions import TypedDict
+
+from src.core.serialization import RowSerializer
 
 
 class PermissionCreateSchema(BaseModel):
@@ -29,9 +32,30 @@ class PermissionResponseSchema(BaseModel):
     model_config = SettingsConfigDict(from_attributes=True)
 
 
+# Row shape of PermissionResponseSchema for the pre-encoded fast path.
+class PermissionRow(TypedDict):
+    id: int
+    name: str
+    description: str | None
+
+
+permission_rows = RowSerializer(PermissionRow)
+
+
 class AssignPermissionSchema(BaseModel):
     permission_name: str
 
 
 class RevokePermissionSchema(BaseModel):
     permission_name: str
+
+
+class BulkPermissionsSchema(BaseModel):
+    role_names: list[str]
+    permission_names: list[str]
+
+
+class BulkPermissionsResultSchema(BaseModel):
+    role_names: list[str]
+    permission_names: list[str]
+    affected: int
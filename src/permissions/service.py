@@ -1,16 +1,30 @@
+import logging
+
+from redis.exceptions import RedisError
+
 from src.permissions.repository import PermissionRepository
 from src.permissions.models import Permission
+from src.permissions.registry import permission_registry
+from src.permissions.sync import role_permissions_sync
+from src.permissions.versions import role_versions
 from src.permissions.schemas import (
     AssignPermissionSchema,
+    BulkPermissionsResultSchema,
+    BulkPermissionsSchema,
     PermissionCreateSchema,
     PermissionDeleteSchema,
     RevokePermissionSchema,
 )
 
+from src.core.pagination import Page, PaginationParams
+
 from src.exceptions.exceptions import AlreadyExistsException, ForbiddenException, NotFoundException
 
 from src.users.repositories import RoleRepository
-from src.users.models import Role
+
+from src.auth.principal import principal_cache
+
+logger = logging.getLogger(__name__)
 
 
 class PermissionService:
@@ -18,15 +32,21 @@ class PermissionService:
         self.permission_repo = permission_repo
         self.role_repo = role_repo
 
-    async def get_all(self) -> list[Permission]:
-        return await self.permission_repo.get_all()
+    async def get_all(self, pagination: PaginationParams) -> Page:
+        return await self.permission_repo.get_rows_page(
+            limit=pagination.limit, after=pagination.after
+        )
 
-    async def get_role_permissions(self, role_name: str) -> list[Permission]:
-        role = await self.role_repo.get_by_name(name=role_name)
-        if not role:
+    async def get_role_permissions(
+        self, role_name: str, pagination: PaginationParams
+    ) -> Page:
+        role_id = await self.role_repo.get_id_by_name(name=role_name)
+        if role_id is None:
             raise NotFoundException(detail=f"Role '{role_name}' not found")
 
-        return role.permissions
+        return await self.permission_repo.get_role_rows_page(
+            role_id=role_id, limit=pagination.limit, after=pagination.after
+        )
 
     async def create(self, permission_data: PermissionCreateSchema) -> Permission:
         if await self.permission_repo.get_by_name(name=permission_data.name):
@@ -36,6 +56,10 @@ class PermissionService:
 
         await self.permission_repo.session.commit()
         await self.permission_repo.session.refresh(new_permission)
+        permission_registry.bit(new_permission.name)
+        permission_registry.bind(
+            name=new_permission.name, permission_id=new_permission.id
+        )
 
         return new_permission
 
@@ -44,8 +68,12 @@ class PermissionService:
         if not permission:
             raise NotFoundException(detail=f"Permission '{permission_data.name}' not found")
 
+        role_ids = await self.permission_repo.get_role_ids(id=permission.id)
         await self.permission_repo.delete(id=permission.id)
         await self.permission_repo.session.commit()
+        permission_registry.drop_permission(permission.name)
+        permission_registry.unbind(permission_id=permission.id)
+        await self._on_roles_changed(role_ids=role_ids)
 
         return permission
 
@@ -61,6 +89,8 @@ class PermissionService:
         if permission not in role.permissions:
             role.permissions.append(permission)
             await self.role_repo.session.commit()
+            permission_registry.grant(role_id=role.id, name=permission.name)
+            await self._on_roles_changed(role_ids=[role.id])
 
         return role.permissions
 
@@ -76,20 +106,84 @@ class PermissionService:
         if permission in role.permissions:
             role.permissions.remove(permission)
             await self.role_repo.session.commit()
+            permission_registry.revoke(role_id=role.id, name=permission.name)
+            await self._on_roles_changed(role_ids=[role.id])
 
         return role.permissions
 
-    async def check_permissions(
-        self, role: Role, permissions: list[str], required_all: bool
-    ) -> None:
-        role_permissions = {permission.name for permission in role.permissions}
-        
+    async def _resolve_matrix(
+        self, matrix: BulkPermissionsSchema
+    ) -> tuple[dict[str, int], dict[str, int]]:
+        role_names = list(dict.fromkeys(matrix.role_names))
+        permission_names = list(dict.fromkeys(matrix.permission_names))
+        roles = await self.role_repo.get_ids_by_names(names=role_names)
+        permissions = await self.permission_repo.get_ids_by_names(names=permission_names)
+
+        missing = [name for name in role_names if name not in roles]
+        missing += [name for name in permission_names if name not in permissions]
+        if missing:
+            raise NotFoundException(detail=f"Roles or permissions not found: {missing}")
+        return roles, permissions
+
+    async def bulk_assign(
+        self, matrix: BulkPermissionsSchema
+    ) -> BulkPermissionsResultSchema:
+        roles, permissions = await self._resolve_matrix(matrix=matrix)
+
+        affected = await self.permission_repo.add_role_grants(
+            role_ids=list(roles.values()), permission_ids=list(permissions.values())
+        )
+        await self.permission_repo.session.commit()
+
+        if affected:
+            for role_id in roles.values():
+                for name in permissions:
+                    permission_registry.grant(role_id=role_id, name=name)
+            await self._on_roles_changed(role_ids=list(roles.values()))
+
+        return BulkPermissionsResultSchema(
+            role_names=list(roles), permission_names=list(permissions), affected=affected
+        )
+
+    async def bulk_revoke(
+        self, matrix: BulkPermissionsSchema
+    ) -> BulkPermissionsResultSchema:
+        roles, permissions = await self._resolve_matrix(matrix=matrix)
+
+        affected = await self.permission_repo.remove_role_grants(
+            role_ids=list(roles.values()), permission_ids=list(permissions.values())
+        )
+        await self.permission_repo.session.commit()
+
+        if affected:
+            for role_id in roles.values():
+                for name in permissions:
+                    permission_registry.revoke(role_id=role_id, name=name)
+            await self._on_roles_changed(role_ids=list(roles.values()))
+
+        return BulkPermissionsResultSchema(
+            role_names=list(roles), permission_names=list(permissions), affected=affected
+        )
+
+    async def _on_roles_changed(self, role_ids: list[int]) -> None:
+        if not role_ids:
+            return
+        for role_id in role_ids:
+            principal_cache.invalidate_role(role_id=role_id)
+            try:
+                await role_versions.bump(id=role_id)
+            except RedisError:
+                logger.warning("Failed to bump role %s version", role_id, exc_info=True)
+        versions = await role_permissions_sync.reserve(role_ids=role_ids)
+        if versions is None:
+            return
+        grants = await self.role_repo.get_grants(ids=role_ids)
+        await role_permissions_sync.publish(grants=grants, versions=versions)
+
+    @staticmethod
+    def check_permissions(role_mask: int, required_mask: int, required_all: bool) -> None:
         if required_all:
-            for permission in permissions:
-                if permission not in role_permissions:
-                    raise ForbiddenException()
-        else:
-            for permission in permissions:
-                if permission in role_permissions:
-                    return
+            if role_mask & required_mask != required_mask:
+                raise ForbiddenException()
+        elif not role_mask & required_mask:
             raise ForbiddenException()
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import logging
+
+from redis.exceptions import RedisError
+
+from src.core.database import async_session_factory
+from src.core.redis import redis_client
+
+from src.permissions.registry import permission_registry
+
+from src.users.repositories import RoleRepository
+
+from src.auth.principal import principal_cache
+
+logger = logging.getLogger(__name__)
+
+# Writes the changed roles into the snapshot, bumps the snapshot version and
+# announces "<version>|<role ids>" in one round trip, so a subscriber that sees
+# version N knows the snapshot already holds everything up to N. A role is only
+# written when its grants carry a newer version than the stored ones, so a slow
+# writer holding an older read cannot overwrite a newer one.
+PUBLISH_SCRIPT = """
+local role_ids = {}
+for i = 1, #ARGV - 1, 3 do
+    local applied = tonumber(redis.call('HGET', KEYS[3], ARGV[i]) or '0')
+    if tonumber(ARGV[i + 2]) > applied then
+        redis.call('HSET', KEYS[1], ARGV[i], ARGV[i + 1])
+        redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 2])
+        table.insert(role_ids, ARGV[i])
+    end
+end
+if #role_ids == 0 then
+    return 0
+end
+local version = redis.call('INCR', KEYS[2])
+redis.call('PUBLISH', ARGV[#ARGV], version .. '|' .. table.concat(role_ids, ','))
+return version
+"""
+
+
+class RolePermissionsSync:
+    SNAPSHOT_KEY = "auth:role_permissions"
+    VERSION_KEY = "auth:role_permissions:version"
+    RESERVED_KEY = "auth:role_permissions:reserved"
+    APPLIED_KEY = "auth:role_permissions:applied"
+    CHANNEL = "auth:role_permissions:events"
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.is_running = False
+        self.full_reloads = 0
+        self.incremental_updates = 0
+        self._publish_script = redis_client.register_script(PUBLISH_SCRIPT)
+        self._task: asyncio.Task | None = None
+        self._loaded = asyncio.Event()
+
+    async def reserve(self, role_ids: list[int]) -> dict[int, int] | None:
+        # Taken before the grants are read: whoever reserves last also reads last,
+        # so the highest version always carries the latest committed grants.
+        try:
+            async with redis_client.pipeline(transaction=False) as pipe:
+                for role_id in role_ids:
+                    pipe.hincrby(self.RESERVED_KEY, str(role_id), 1)
+                versions = await pipe.execute()
+        except RedisError:
+            logger.warning("Failed to reserve role permissions versions", exc_info=True)
+            return None
+        return dict(zip(role_ids, versions))
+
+    async def publish(
+        self, grants: dict[int, list[tuple[int, str]]], versions: dict[int, int]
+    ) -> None:
+        args: list[str] = []
+        for role_id, version in versions.items():
+            role_grants = grants.get(role_id, [])
+            args.extend((str(role_id), json.dumps(role_grants), str(version)))
+        if not args:
+            return
+        args.append(self.CHANNEL)
+        try:
+            await self._publish_script(
+                keys=[self.SNAPSHOT_KEY, self.VERSION_KEY, self.APPLIED_KEY], args=args
+            )
+        except RedisError:
+            # Peers notice the missing version on the next message or reconnect.
+            logger.warning("Failed to publish role permissions change", exc_info=True)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.is_running = False
+
+    async def wait_loaded(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self._loaded.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def load_from_database(self) -> None:
+        # Serves this worker from the database when Redis is unreachable; the
+        # snapshot replaces it as soon as the sync task connects.
+        for role_id, role_grants in (await self._get_grants()).items():
+            self._apply(role_id=role_id, role_grants=role_grants)
+        self._loaded.set()
+
+    async def _run(self) -> None:
+        while True:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            try:
+                # Subscribe before loading so nothing published in between is lost.
+                await pubsub.subscribe(self.CHANNEL)
+                await self._reload()
+                self.is_running = True
+                self._loaded.set()
+                async for message in pubsub.listen():
+                    await self._handle(message["data"])
+            except (RedisError, OSError):
+                logger.warning(
+                    "Role permissions sync lost Redis, retrying", exc_info=True
+                )
+            except Exception:
+                logger.exception("Role permissions sync failed, retrying")
+            finally:
+                self.is_running = False
+                await pubsub.aclose()
+            await asyncio.sleep(1)
+
+    async def _handle(self, data: str) -> None:
+        version, _, raw_role_ids = data.partition("|")
+        version = int(version)
+        if version <= self.version:
+            return
+        if version != self.version + 1:
+            await self._reload()
+            return
+
+        role_ids = raw_role_ids.split(",")
+        values = await redis_client.hmget(self.SNAPSHOT_KEY, role_ids)
+        for role_id, value in zip(role_ids, values):
+            self._apply(role_id=int(role_id), role_grants=json.loads(value or "[]"))
+        self.version = version
+        self.incremental_updates += 1
+
+    async def _reload(self) -> None:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.get(self.VERSION_KEY)
+            pipe.hgetall(self.SNAPSHOT_KEY)
+            version, snapshot = await pipe.execute()
+
+        if version is None:
+            await self._bootstrap()
+            return
+
+        for role_id, value in snapshot.items():
+            self._apply(role_id=int(role_id), role_grants=json.loads(value))
+        self.version = int(version)
+        self.full_reloads += 1
+
+    @staticmethod
+    async def _get_grants() -> dict[int, list[tuple[int, str]]]:
+        async with async_session_factory() as session:
+            return await RoleRepository(session).get_grants()
+
+    async def _bootstrap(self) -> None:
+        grants = await self._get_grants()
+        versions = await self.reserve(role_ids=list(grants))
+        if versions is not None:
+            # Read again after reserving, like any other writer.
+            grants = await self._get_grants()
+            await self.publish(grants=grants, versions=versions)
+        for role_id, role_grants in grants.items():
+            self._apply(role_id=role_id, role_grants=role_grants)
+
+    @staticmethod
+    def _apply(role_id: int, role_grants: list) -> None:
+        for permission_id, name in role_grants:
+            permission_registry.bind(name=name, permission_id=permission_id)
+        permission_registry.set_role(
+            role_id=role_id, names=[name for _, name in role_grants]
+        )
+        principal_cache.invalidate_role(role_id=role_id)
+
+
+role_permissions_sync = RolePermissionsSync()
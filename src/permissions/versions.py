@@ -0,0 +1,105 @@
+import os
+import time
+
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.redis import redis_client
+
+
+class VersionStore:
+    def __init__(
+        self,
+        prefix: str,
+        backend: str,
+        cache_ttl_seconds: float,
+        max_cache_size: int = 100_000,
+    ) -> None:
+        if backend not in ("redis", "memory"):
+            raise ValueError(f"Unknown version backend '{backend}'")
+        # Memory versions live in one process: a bump on one worker would never
+        # reach the others, which keep accepting the stale tokens. Only a worker
+        # count set through WEB_CONCURRENCY can be seen here, not a --workers flag.
+        workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+        if backend == "memory" and workers > 1:
+            raise ValueError(
+                f"Memory version backend for '{prefix}' needs a single worker, "
+                f"WEB_CONCURRENCY is {workers}"
+            )
+        self.prefix = prefix
+        self.backend = backend
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_cache_size = max_cache_size
+        self._memory: dict[int, int] = {}
+        self._cache: dict[int, tuple[float, int]] = {}
+
+    def __get_key(self, id: int) -> str:
+        return f"{self.prefix}{id}"
+
+    async def get(self, id: int, fresh: bool = False) -> int | None:
+        if self.backend == "memory":
+            return self._memory.get(id, 0)
+
+        now = time.monotonic()
+        cached = self._cache.get(id)
+        if not fresh and cached and cached[0] > now:
+            return cached[1]
+
+        try:
+            value = await redis_client.get(name=self.__get_key(id=id))
+        except RedisError:
+            return None
+        version = int(value or 0)
+        self._remember(id=id, version=version, now=now)
+        return version
+
+    async def get_many(self, ids: list[int]) -> dict[int, int] | None:
+        if self.backend == "memory":
+            return {id: self._memory.get(id, 0) for id in ids}
+
+        now = time.monotonic()
+        versions: dict[int, int] = {}
+        missing: list[int] = []
+        for id in dict.fromkeys(ids):
+            cached = self._cache.get(id)
+            if cached and cached[0] > now:
+                versions[id] = cached[1]
+            else:
+                missing.append(id)
+        if not missing:
+            return versions
+
+        try:
+            values = await redis_client.mget([self.__get_key(id=id) for id in missing])
+        except RedisError:
+            return None
+        for id, value in zip(missing, values):
+            versions[id] = int(value or 0)
+            self._remember(id=id, version=versions[id], now=now)
+        return versions
+
+    async def bump(self, id: int) -> int:
+        if self.backend == "memory":
+            version = self._memory.get(id, 0) + 1
+            self._memory[id] = version
+            return version
+
+        version = await redis_client.incr(name=self.__get_key(id=id))
+        self._remember(id=id, version=version, now=time.monotonic())
+        return version
+
+    def _remember(self, id: int, version: int, now: float) -> None:
+        if len(self._cache) >= self.max_cache_size:
+            self._cache = {
+                key: entry for key, entry in self._cache.items() if entry[0] > now
+            }
+            if len(self._cache) >= self.max_cache_size:
+                self._cache.clear()
+        self._cache[id] = (now + self.cache_ttl_seconds, version)
+
+
+role_versions = VersionStore(
+    prefix="auth:role_version:",
+    backend=settings.ROLE_VERSION_BACKEND,
+    cache_ttl_seconds=settings.ROLE_VERSION_CACHE_TTL_SEC,
+)
@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from dataclasses import dataclass
+
+from pydantic import ValidationError
+
+from src.users.schemas import UserCreateSchema
+
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+@dataclass(slots=True)
+class ImportRow:
+    line: int
+    user: UserCreateSchema | None = None
+    email: str | None = None
+    error: str | None = None
+
+
+def _to_row(line: int, data: object) -> ImportRow:
+    email = data.get("email") if isinstance(data, dict) else None
+    try:
+        user = UserCreateSchema.model_validate(data)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        detail = f"{location}: {error['msg']}" if location else error["msg"]
+        return ImportRow(line=line, email=email, error=detail)
+    return ImportRow(line=line, user=user, email=user.email)
+
+
+def parse_import(content: str, import_format: str) -> list[ImportRow]:
+    rows: list[ImportRow] = []
+    if import_format == "csv":
+        reader = csv.DictReader(io.StringIO(content))
+        for record in reader:
+            rows.append(_to_row(line=reader.line_num, data=record))
+    elif import_format == "ndjson":
+        for line, raw in enumerate(content.splitlines(), start=1):
+            if not raw.strip():
+                continue
+            try:
+                data = json.loads(raw)
+            except json.JSONDecodeError as exc:
+                rows.append(ImportRow(line=line, error=f"Invalid JSON: {exc.msg}"))
+                continue
+            rows.append(_to_row(line=line, data=data))
+    else:
+        raise ValueError(f"Unknown import format '{import_format}'")
+    return rows
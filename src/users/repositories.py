@@ -1,23 +1,122 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import defaultload
 
 from src.core.base_repository import SQLARepository
+from src.core.models import RolesPermissions
+
+from src.permissions.models import Permission
 
 from src.users.models import Role, User
 
 
 class UserRepository(SQLARepository):
     model = User
+    # Listings and profile reads only render the role itself, never its permissions.
+    page_options = (defaultload(User.role).raiseload(Role.permissions),)
 
     def __init__(self, session: AsyncSession):
         super().__init__(session)
 
+    def _rows_query(self):
+        return select(
+            User.id,
+            User.email,
+            User.full_name,
+            User.is_active,
+            Role.id.label("role_id"),
+            Role.name.label("role_name"),
+            Role.description.label("role_description"),
+        ).join(User.role)
+
+    @staticmethod
+    def _to_row(row) -> dict:
+        return {
+            "id": row.id,
+            "email": row.email,
+            "full_name": row.full_name,
+            "is_active": row.is_active,
+            "role": {
+                "id": row.role_id,
+                "name": row.role_name,
+                "description": row.role_description,
+            },
+        }
+
+    async def get_profile_row(self, id: int) -> dict | None:
+        result = await self.session.execute(self._rows_query().where(self.model.id == id))
+        row = result.one_or_none()
+        return self._to_row(row) if row is not None else None
+
     async def get_by_email(self, email: str):
         result = await self.session.execute(
-            select(self.model).where(self.model.email == email)
+            select(self.model)
+            .where(self.model.email == email)
+            .options(*self.page_options)
         )
         return result.scalar_one_or_none()
 
+    async def get_existing_emails(self, emails: list[str], chunk_size: int) -> set[str]:
+        existing: set[str] = set()
+        for start in range(0, len(emails), chunk_size):
+            result = await self.session.execute(
+                select(self.model.email).where(
+                    self.model.email.in_(emails[start : start + chunk_size])
+                )
+            )
+            existing.update(result.scalars().all())
+        return existing
+
+    async def bulk_create(self, rows: list[dict]) -> dict[str, int]:
+        # One multi-row INSERT; rows that lost a race on the unique email are
+        # skipped by the conflict clause and simply missing from RETURNING.
+        result = await self.session.execute(
+            insert(self.model)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=[self.model.email])
+            .returning(self.model.id, self.model.email)
+        )
+        return {email: id for id, email in result.all()}
+
+    async def get_role_grants(self, id: int) -> tuple[int, list[tuple[int, str]]] | None:
+        result = await self.session.execute(
+            select(self.model.role_id, Permission.id, Permission.name)
+            .outerjoin(RolesPermissions, RolesPermissions.role_id == self.model.role_id)
+            .outerjoin(Permission, Permission.id == RolesPermissions.permission_id)
+            .where(self.model.id == id)
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        grants = [(permission_id, name) for _, permission_id, name in rows if name]
+        return rows[0].role_id, grants
+
 
 class RoleRepository(SQLARepository):
     model = Role
+
+    async def get_id_by_name(self, name: str) -> int | None:
+        result = await self.session.execute(
+            select(self.model.id).where(self.model.name == name)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_grants(
+        self, ids: list[int] | None = None
+    ) -> dict[int, list[tuple[int, str]]]:
+        query = (
+            select(self.model.id, Permission.id, Permission.name)
+            .outerjoin(RolesPermissions, RolesPermissions.role_id == self.model.id)
+            .outerjoin(Permission, Permission.id == RolesPermissions.permission_id)
+        )
+        if ids is not None:
+            query = query.where(self.model.id.in_(ids))
+        result = await self.session.execute(query)
+
+        grants: dict[int, list[tuple[int, str]]] = {}
+        for role_id, permission_id, name in result.all():
+            role_grants = grants.setdefault(role_id, [])
+            if name is not None:
+                role_grants.append((permission_id, name))
+        return grants
@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Body, Depends
+from fastapi import APIRouter, Body, Depends, Request
 from typing import Annotated
 
 from src.auth.dependencies import AuthenticateUserDep, PermissionDep
+from src.auth.principal import Principal
+
+from src.core.config import settings
+from src.core.pagination import PageSchema, PaginationDep, PaginationParams
+
+from src.exceptions.exceptions import BadRequestException
 
 from src.users.dependencies import GetUserServiceDep
+from src.users.importer import IMPORT_FORMATS, parse_import
 from src.users.service import UserService
-from src.users.models import User
 from src.users.schemas import (
+    BulkImportResultSchema,
     RoleAssignSchema,
     RoleResponseSchema,
     UserResponseSchema,
     UserPartialUpdateSchema,
     UserUpdateSchema,
+    user_rows,
 )
 
 
@@ -20,19 +28,25 @@ router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get(
     "",
-    response_model=list[UserResponseSchema],
+    response_model=PageSchema[UserResponseSchema],
     status_code=200,
     dependencies=[
         Depends(PermissionDep(["users:read", "users:full_access"], required_all=False))
     ],
 )
-async def get_all_users(user_service: Annotated[UserService, Depends(GetUserServiceDep)]):
-    return await user_service.get_all()
+async def get_all_users(
+    pagination: Annotated[PaginationParams, Depends(PaginationDep)],
+    user_service: Annotated[UserService, Depends(GetUserServiceDep)],
+):
+    return user_rows.page_response(await user_service.get_all(pagination=pagination))
 
 
 @router.get("/me", response_model=UserResponseSchema, status_code=200)
-async def get_my_info(current_user: Annotated[User, Depends(AuthenticateUserDep)]):
-    return current_user
+async def get_my_info(
+    current_user: Annotated[Principal, Depends(AuthenticateUserDep)],
+    user_service: Annotated[UserService, Depends(GetUserServiceDep)],
+):
+    return user_rows.response(await user_service.get_profile(user_id=current_user.id))
 
 
 @router.get(
@@ -49,6 +63,38 @@ async def get_user_by_email(
     return await user_service.get_by_email(user_email=user_email)
 
 
+@router.post(
+    "/bulk",
+    response_model=BulkImportResultSchema,
+    status_code=200,
+    dependencies=[
+        Depends(PermissionDep(["users:create", "users:full_access"], required_all=False))
+    ],
+)
+async def bulk_import_users(
+    request: Request,
+    user_service: Annotated[UserService, Depends(GetUserServiceDep)],
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if (import_format := IMPORT_FORMATS.get(content_type)) is None:
+        raise BadRequestException(
+            detail=f"Unsupported content type, expected one of {sorted(IMPORT_FORMATS)}"
+        )
+
+    body = await request.body()
+    try:
+        content = body.decode("utf-8")
+    except UnicodeDecodeError:
+        raise BadRequestException(detail="Import must be UTF-8 encoded")
+    rows = parse_import(content=content, import_format=import_format)
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise BadRequestException(
+            detail=f"Import is limited to {settings.BULK_IMPORT_MAX_ROWS} rows"
+        )
+
+    return await user_service.import_users(rows=rows)
+
+
 @router.post(
     "/assign-role", 
     response_model=UserResponseSchema, 
@@ -72,7 +118,7 @@ async def assign_role(
 
 @router.patch("/me", response_model=UserResponseSchema, status_code=200)
 async def partial_update_my_profile(
-    current_user: Annotated[User, Depends(AuthenticateUserDep)],
+    current_user: Annotated[Principal, Depends(AuthenticateUserDep)],
     user_data: Annotated[UserPartialUpdateSchema, Body()],
     user_service: Annotated[UserService, Depends(GetUserServiceDep)],
 ):
@@ -83,7 +129,7 @@ async def partial_update_my_profile(
 
 @router.put("/me", response_model=UserResponseSchema, status_code=200)
 async def update_my_profile(
-    current_user: Annotated[User, Depends(AuthenticateUserDep)],
+    current_user: Annotated[Principal, Depends(AuthenticateUserDep)],
     user_data: Annotated[UserUpdateSchema, Body()],
     user_service: Annotated[UserService, Depends(GetUserServiceDep)],
 ):
@@ -94,7 +140,7 @@ async def update_my_profile(
 
 @router.delete("/me", response_model=UserResponseSchema, status_code=200)
 async def deactivate_my_account(
-    current_user: Annotated[User, Depends(AuthenticateUserDep)],
+    current_user: Annotated[Principal, Depends(AuthenticateUserDep)],
     user_service: Annotated[UserService, Depends(GetUserServiceDep)],
 ):
     return await user_service.deactivate_account(user_id=current_user.id)
@@ -1,5 +1,10 @@
+from typing import Literal
+
 from pydantic import BaseModel
 from pydantic_settings import SettingsConfigDict
+from typing_extensions import TypedDict
+
+from src.core.serialization import RowSerializer
 
 
 class RoleAssignSchema(BaseModel):
@@ -40,3 +45,36 @@ class UserResponseSchema(BaseModel):
     role: RoleResponseSchema
 
     model_config = SettingsConfigDict(from_attributes=True)
+
+
+# Row shapes of UserResponseSchema for the pre-encoded fast path.
+class RoleRow(TypedDict):
+    id: int
+    name: str
+    description: str | None
+
+
+class UserRow(TypedDict):
+    id: int
+    email: str
+    full_name: str | None
+    is_active: bool
+    role: RoleRow
+
+
+user_rows = RowSerializer(UserRow)
+
+
+class BulkImportRowSchema(BaseModel):
+    line: int
+    email: str | None = None
+    status: Literal["created", "duplicate", "invalid"]
+    id: int | None = None
+    detail: str | None = None
+
+
+class BulkImportResultSchema(BaseModel):
+    created: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+    rows: list[BulkImportRowSchema] = []
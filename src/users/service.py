@@ -1,14 +1,21 @@
 from src.users.repositories import RoleRepository, UserRepository
 from src.users.models import User
+from src.users.importer import ImportRow
 from src.users.schemas import (
+    BulkImportResultSchema,
+    BulkImportRowSchema,
     RoleAssignSchema, 
     UserCreateSchema, 
     UserPartialUpdateSchema, 
     UserUpdateSchema
 )
 
+from src.auth.epochs import revoke_user_sessions
+from src.auth.principal import principal_cache
+
 from src.core.config import settings
-from src.core.security import hash_password
+from src.core.pagination import Page, PaginationParams
+from src.core.security import hash_password_async, hash_passwords_async
 
 from src.exceptions.exceptions import AlreadyExistsException
 from src.exceptions.exceptions import NotFoundException
@@ -19,19 +26,31 @@ class UserService:
         self.user_repo = user_repo
         self.role_repo = role_repo
 
-    async def get_all(self) -> list[User]:
-        return await self.user_repo.get_all()
+    async def get_all(self, pagination: PaginationParams) -> Page:
+        return await self.user_repo.get_rows_page(
+            limit=pagination.limit, after=pagination.after
+        )
 
     async def get_by_id(self, user_id: int) -> User:
         if (user := await self.user_repo.get(id=user_id)):
             return user
         raise NotFoundException(detail=f"User with id={user_id} not found")
 
+    async def get_profile(self, user_id: int) -> dict:
+        if user := await self.user_repo.get_profile_row(id=user_id):
+            return user
+        raise NotFoundException(detail=f"User with id={user_id} not found")
+
     async def get_by_email(self, user_email: str) -> User:
         if (user := await self.user_repo.get_by_email(email=user_email)):
             return user
         raise NotFoundException(detail=f"User with email={user_email} not found")
-    
+
+    async def get_role_grants(self, user_id: int) -> tuple[int, list[tuple[int, str]]]:
+        if grants := await self.user_repo.get_role_grants(id=user_id):
+            return grants
+        raise NotFoundException(detail=f"User with id={user_id} not found")
+
     async def create(self, user_data: UserCreateSchema) -> User:
         try:
             if await self.get_by_email(user_email=user_data.email):
@@ -42,7 +61,9 @@ class UserService:
             pass
 
         new_user_data = user_data.model_dump(exclude={"password"})
-        new_user_data["hashed_password"] = hash_password(password=user_data.password)
+        new_user_data["hashed_password"] = await hash_password_async(
+            password=user_data.password
+        )
 
         default_role = await self.role_repo.get_by_name(name=settings.DEFAULT_USER_ROLE)
 
@@ -54,6 +75,95 @@ class UserService:
 
         return new_user
 
+    async def import_users(self, rows: list[ImportRow]) -> BulkImportResultSchema:
+        result = BulkImportResultSchema()
+
+        unique_rows: dict[str, ImportRow] = {}
+        for row in rows:
+            if row.user is None:
+                result.rows.append(
+                    BulkImportRowSchema(
+                        line=row.line, email=row.email, status="invalid", detail=row.error
+                    )
+                )
+            elif row.user.email in unique_rows:
+                result.rows.append(
+                    BulkImportRowSchema(
+                        line=row.line,
+                        email=row.email,
+                        status="duplicate",
+                        detail="Duplicate email in import",
+                    )
+                )
+            else:
+                unique_rows[row.user.email] = row
+
+        chunk_size = settings.BULK_IMPORT_CHUNK_SIZE
+        existing = await self.user_repo.get_existing_emails(
+            emails=list(unique_rows), chunk_size=chunk_size
+        )
+        new_rows = [row for email, row in unique_rows.items() if email not in existing]
+        for email in existing:
+            row = unique_rows[email]
+            result.rows.append(
+                BulkImportRowSchema(
+                    line=row.line,
+                    email=email,
+                    status="duplicate",
+                    detail="Already exists",
+                )
+            )
+
+        default_role_id = await self.role_repo.get_id_by_name(
+            name=settings.DEFAULT_USER_ROLE
+        )
+
+        # Hashed chunk by chunk, so only one chunk of hashes is held at a time and
+        # each insert starts as soon as its own passwords are ready.
+        for start in range(0, len(new_rows), chunk_size):
+            chunk = new_rows[start : start + chunk_size]
+            hashed_passwords = await hash_passwords_async(
+                passwords=[row.user.password for row in chunk]
+            )
+            created = await self.user_repo.bulk_create(
+                rows=[
+                    {
+                        **row.user.model_dump(exclude={"password"}),
+                        "hashed_password": hashed_password,
+                        "role_id": default_role_id,
+                    }
+                    for row, hashed_password in zip(chunk, hashed_passwords)
+                ]
+            )
+            await self.user_repo.session.commit()
+
+            for row in chunk:
+                if (user_id := created.get(row.email)) is not None:
+                    result.rows.append(
+                        BulkImportRowSchema(
+                            line=row.line, email=row.email, status="created", id=user_id
+                        )
+                    )
+                else:
+                    result.rows.append(
+                        BulkImportRowSchema(
+                            line=row.line,
+                            email=row.email,
+                            status="duplicate",
+                            detail="Already exists",
+                        )
+                    )
+
+        result.rows.sort(key=lambda row: row.line)
+        for row in result.rows:
+            if row.status == "created":
+                result.created += 1
+            elif row.status == "duplicate":
+                result.duplicates += 1
+            else:
+                result.invalid += 1
+        return result
+
     async def update_user_role(
         self,
         user_email: str,
@@ -67,7 +177,11 @@ class UserService:
         
         await self.user_repo.update(id=user.id, data={"role_id": role.id})
 
+        # Outstanding tokens may embed the old role's permissions. Revoked before the
+        # commit, so a Redis outage rolls the change back instead of losing the bump.
+        await revoke_user_sessions(user_id=user.id)
         await self.user_repo.session.commit()
+        principal_cache.invalidate_user(user_id=user.id)
         await self.user_repo.session.refresh(user)
 
         return user
@@ -86,21 +200,31 @@ class UserService:
                 raise AlreadyExistsException(detail=f"Email {existing.email} already use")
 
         if "password" in data_to_update:
-            data_to_update["hashed_password"] = hash_password(
+            data_to_update["hashed_password"] = await hash_password_async(
                 data_to_update.pop("password")
             )
 
         updated_user = await self.user_repo.update(id=user_id, data=data_to_update)
 
+        if "hashed_password" in data_to_update:
+            await revoke_user_sessions(user_id=user_id)
         await self.user_repo.session.commit()
+        principal_cache.invalidate_user(user_id=user_id)
         await self.user_repo.session.refresh(updated_user)
 
         return updated_user
 
+    async def update_password_hash(self, user_id: int, hashed_password: str) -> None:
+        # Same password, stronger hash: existing sessions stay valid.
+        await self.user_repo.update(id=user_id, data={"hashed_password": hashed_password})
+        await self.user_repo.session.commit()
+
     async def deactivate_account(self, user_id: int) -> User:
         user = await self.get_by_id(user_id=user_id)
 
         await self.user_repo.update(id=user_id, data={"is_active": False})
+        await revoke_user_sessions(user_id=user_id)
         await self.user_repo.session.commit()
+        principal_cache.invalidate_user(user_id=user_id)
 
         return user
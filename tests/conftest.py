@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp()
+os.environ.update(
+    SQLITE_DSN=f"sqlite+aiosqlite:///{_db_dir}/test.db",
+    JWT_SECRET="test-secret",
+    DEFAULT_USER_ROLE="consumer",
+    PASSWORD_HASH_PARAMS_FILE=f"{_db_dir}/argon2.json",
+    WARMUP_ENABLED="false",
+)
+
+import fakeredis  # noqa: E402
+
+import src.core.redis as redis_module  # noqa: E402
+
+# Swapped in before anything imports the clients, so the app never needs a server.
+_server = fakeredis.FakeServer()
+redis_module.redis_client = fakeredis.FakeAsyncRedis(
+    server=_server, decode_responses=True
+)
+redis_module.blacklist_redis_client = fakeredis.FakeAsyncRedis(
+    server=_server, decode_responses=True
+)
+if redis_module.blacklist_binary_redis_client is not None:
+    redis_module.blacklist_binary_redis_client = fakeredis.FakeAsyncRedis(
+        server=_server, decode_responses=False
+    )
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from src.core.seed import start_seed  # noqa: E402
+from src.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    asyncio.run(start_seed())
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,28 @@
+from src.metrics.queries import assert_query_budget
+
+
+def login(client, email: str, password: str) -> dict:
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def test_login_query_budget(client):
+    with assert_query_budget(1):
+        login(client, "consumer@example.com", "consumer_password")
+
+
+def test_users_me_query_budget(client):
+    headers = login(client, "consumer@example.com", "consumer_password")
+    client.get("/users/me", headers=headers)
+    # The profile row is the only statement once the principal is cached.
+    with assert_query_budget(1):
+        assert client.get("/users/me", headers=headers).status_code == 200
+
+
+def test_products_query_budget(client):
+    headers = login(client, "consumer@example.com", "consumer_password")
+    client.get("/products", headers=headers)
+    # Once the principal is cached, permission checks need no database at all.
+    with assert_query_budget(0):
+        assert client.get("/products", headers=headers).status_code == 200